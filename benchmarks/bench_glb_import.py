@@ -0,0 +1,138 @@
+"""Import time of the stock glTF importer vs the add-on's fast GLB loader.
+
+Runs inside Blender, on the given GLB files or on a generated textured grid:
+
+    blender -b --factory-startup --python benchmarks/bench_glb_import.py -- [--faces 1000000] [--repeat 3] [model.glb ...]
+"""
+import argparse
+import io
+import json
+import struct
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import bpy
+import numpy as np
+from PIL import Image
+
+# Import the loader from the addon sources, without registering the addon.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "hunyuan3d_blender"))
+from utils import glb_loader  # noqa: E402
+
+
+def make_grid_glb(filepath: Path, faces: int, texture_size: int = 1024) -> None:
+    """A single-mesh, single-material GLB shaped like the Hunyuan outputs: split vertices, normals, UVs, PNG texture."""
+    quads = max(1, faces // 2)
+    side = int(np.sqrt(quads))
+    u, v = np.meshgrid(np.linspace(0.0, 1.0, side + 1, dtype=np.float32), np.linspace(0.0, 1.0, side + 1, dtype=np.float32))
+    positions = np.stack([u.ravel() - 0.5, np.sin(u.ravel() * 6.0) * 0.05, v.ravel() - 0.5], axis=1).astype(np.float32)
+    normals = np.tile(np.array([0.0, 1.0, 0.0], dtype=np.float32), (len(positions), 1))
+    uvs = np.stack([u.ravel(), v.ravel()], axis=1).astype(np.float32)
+    corner = (np.arange(side)[:, None] * (side + 1) + np.arange(side)[None, :]).ravel()
+    indices = np.stack([corner, corner + side + 1, corner + 1, corner + 1, corner + side + 1, corner + side + 2], axis=1)
+    indices = indices.astype(np.uint32).ravel()
+
+    texture = io.BytesIO()
+    Image.fromarray(np.random.default_rng(0).integers(0, 255, (texture_size, texture_size, 3), dtype=np.uint8)).save(texture, format="PNG")
+
+    blobs, views, accessors = [], [], []
+
+    def add_view(data: bytes) -> int:
+        offset = sum(len(blob) for blob in blobs)
+        blobs.append(data + b"\0" * (-len(data) % 4))
+        views.append({"buffer": 0, "byteOffset": offset, "byteLength": len(data)})
+        return len(views) - 1
+
+    def add_accessor(array: np.ndarray, component_type: int, type_name: str, **extra) -> int:
+        accessors.append({"bufferView": add_view(array.tobytes()), "componentType": component_type,
+                          "count": len(array), "type": type_name, **extra})
+        return len(accessors) - 1
+
+    attributes = {
+        "POSITION": add_accessor(positions, 5126, "VEC3", min=positions.min(0).tolist(), max=positions.max(0).tolist()),
+        "NORMAL": add_accessor(normals, 5126, "VEC3"),
+        "TEXCOORD_0": add_accessor(uvs, 5126, "VEC2"),
+    }
+    gltf = {
+        "asset": {"version": "2.0"},
+        "scene": 0,
+        "scenes": [{"nodes": [0]}],
+        "nodes": [{"mesh": 0, "name": "grid"}],
+        "meshes": [{"name": "grid", "primitives": [{"attributes": attributes, "indices": add_accessor(indices, 5125, "SCALAR"), "material": 0}]}],
+        "materials": [{"name": "grid", "pbrMetallicRoughness": {"baseColorTexture": {"index": 0}, "metallicFactor": 0.0}}],
+        "textures": [{"source": 0}],
+        "images": [{"bufferView": add_view(texture.getvalue()), "mimeType": "image/png"}],
+        "accessors": accessors,
+        "bufferViews": views,
+    }
+    binary = b"".join(blobs)
+    gltf["buffers"] = [{"byteLength": len(binary)}]
+    json_chunk = json.dumps(gltf).encode("utf-8")
+    json_chunk += b" " * (-len(json_chunk) % 4)
+    with open(filepath, "wb") as f:
+        f.write(struct.pack("<4sII", b"glTF", 2, 12 + 8 + len(json_chunk) + 8 + len(binary)))
+        f.write(struct.pack("<II", len(json_chunk), glb_loader.CHUNK_TYPE_JSON) + json_chunk)
+        f.write(struct.pack("<II", len(binary), glb_loader.CHUNK_TYPE_BIN) + binary)
+
+
+def reset_scene() -> None:
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+
+
+def stock_import(filepath: Path) -> list[bpy.types.Object]:
+    objects_before = set(bpy.data.objects)
+    bpy.ops.import_scene.gltf(filepath=str(filepath))
+    return [obj for obj in bpy.data.objects if obj not in objects_before]
+
+
+def fast_import(filepath: Path) -> list[bpy.types.Object]:
+    return glb_loader.load_glb(str(filepath), bpy.context.collection)
+
+
+def measure(func, filepath: Path, repeat: int) -> tuple[float, tuple[int, int]]:
+    best = float("inf")
+    counts = (0, 0)
+    for _ in range(repeat):
+        reset_scene()
+        start = time.perf_counter()
+        objects = func(filepath)
+        best = min(best, time.perf_counter() - start)
+        meshes = [obj.data for obj in objects if obj.type == 'MESH']
+        counts = (sum(len(mesh.vertices) for mesh in meshes), sum(len(mesh.polygons) for mesh in meshes))
+    return best, counts
+
+
+def main():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("files", nargs="*", type=Path)
+    parser.add_argument("--faces", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    files = args.files
+    if not files:
+        tmp_dir = Path(tempfile.mkdtemp())
+        generated = tmp_dir / f"grid_{args.faces}.glb"
+        make_grid_glb(generated, args.faces)
+        files = [generated]
+
+    print(f"{'file':<32} {'importer':>10} {'fast':>10} {'speedup':>8}  vertices / faces")
+    for filepath in files:
+        try:
+            with glb_loader.GLBFile(str(filepath)) as glb:
+                glb_loader.check_supported(glb.json)
+        except glb_loader.UnsupportedGLB as e:
+            print(f"{filepath.name:<32} skipped: {e}")
+            continue
+        stock_time, stock_counts = measure(stock_import, filepath, args.repeat)
+        fast_time, fast_counts = measure(fast_import, filepath, args.repeat)
+        note = "" if stock_counts == fast_counts else f"  MISMATCH importer {stock_counts}"
+        print(f"{filepath.name:<32} {stock_time:>9.2f}s {fast_time:>9.2f}s {stock_time / fast_time:>7.1f}x  "
+              f"{fast_counts[0]} / {fast_counts[1]}{note}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Peak memory of the preview decode path: legacy float32 pipeline vs uint8-native pipeline.
+
+Runs outside Blender (only numpy, imageio and pillow are needed):
+
+    python benchmarks/bench_preview_decode.py [--size 1024] [--repeat 5]
+"""
+import argparse
+import io
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import imageio.v3 as iio
+import numpy as np
+
+# Import the bpy-free pixel stages directly, without going through the addon package.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "hunyuan3d_blender" / "utils"))
+import pixels  # noqa: E402
+
+
+def make_preview_png(size: int) -> bytes:
+    """A render-like preview: white background with a coloured blob in the middle."""
+    yy, xx = np.mgrid[0:size, 0:size]
+    radius = size * 0.3
+    inside = (yy - size / 2) ** 2 + (xx - size / 2) ** 2 < radius ** 2
+    img = np.full((size, size, 4), 255, dtype=np.uint8)
+    img[inside, 0] = (xx[inside] * 255 // size).astype(np.uint8)
+    img[inside, 1] = (yy[inside] * 255 // size).astype(np.uint8)
+    img[inside, 2] = 96
+    buffer = io.BytesIO()
+    iio.imwrite(buffer, img, extension=".png")
+    return buffer.getvalue()
+
+
+def legacy_pipeline(img_bytes: bytes) -> np.ndarray:
+    """The previous get_image_from_url path: float32 first, crop, flipud copy, ravel copy."""
+    img = iio.imread(img_bytes, pilmode="RGBA")
+    img = img.astype(np.float32) / 255.0
+    r, g, b, a = img[..., 0], img[..., 1], img[..., 2], img[..., 3]
+    mask = ~((r == 1.0) & (g == 1.0) & (b == 1.0) | (a == 0.0))
+    rows = np.any(mask, axis=1)
+    cols = np.any(mask, axis=0)
+    y_min, y_max = np.where(rows)[0][[0, -1]]
+    x_min, x_max = np.where(cols)[0][[0, -1]]
+    y_min = max(0, y_min - 5)
+    y_max = min(img.shape[0] - 1, y_max + 5)
+    x_min = max(0, x_min - 5)
+    x_max = min(img.shape[1] - 1, x_max + 5)
+    img = img[y_min:y_max + 1, x_min:x_max + 1]
+    return np.flipud(img).ravel()
+
+
+def uint8_pipeline(img_bytes: bytes) -> np.ndarray:
+    img = pixels.decode_image_bytes("bench", img_bytes)
+    _img_flipped, flat = pixels.prepare_preview_pixels(img)
+    return flat
+
+
+def measure(func, img_bytes: bytes, repeat: int) -> tuple[int, float, np.ndarray]:
+    result = func(img_bytes)  # warm up imageio plugins
+    peak = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        tracemalloc.start()
+        result = func(img_bytes)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    elapsed = (time.perf_counter() - start) / repeat
+    return peak, elapsed, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=1024)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    img_bytes = make_preview_png(args.size)
+    print(f"Preview {args.size}x{args.size} RGBA ({len(img_bytes) / 1024:.0f} KiB PNG), {args.repeat} runs")
+
+    legacy_peak, legacy_time, legacy_result = measure(legacy_pipeline, img_bytes, args.repeat)
+    new_peak, new_time, new_result = measure(uint8_pipeline, img_bytes, args.repeat)
+
+    assert legacy_result.shape == new_result.shape, (legacy_result.shape, new_result.shape)
+    assert np.allclose(legacy_result, new_result, atol=1e-6), "pipelines disagree"
+
+    mib = 1024 * 1024
+    print(f"{'pipeline':<10} {'peak MiB':>10} {'ms/image':>10}")
+    print(f"{'float32':<10} {legacy_peak / mib:>10.2f} {legacy_time * 1000:>10.2f}")
+    print(f"{'uint8':<10} {new_peak / mib:>10.2f} {new_time * 1000:>10.2f}")
+    print(f"peak memory reduced {legacy_peak / new_peak:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
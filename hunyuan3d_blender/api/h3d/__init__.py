@@ -1,9 +1,9 @@
 from .generations import generate_3d_model, generate_3d_model_from_image
-from .detail import get_creation_details
+from .detail import CreationUnavailableError, get_creation_details
 from .list import get_creations_list
 from .getuserinfo import get_user_info
 from .quotainfo import get_quota_info
 from .config import get_h3d_config
 from .login import login_with_email
 
-__all__ = ["generate_3d_model", "generate_3d_model_from_image", "get_creation_details", "get_creations_list", "get_user_info", "get_quota_info", "get_h3d_config", "login_with_email"]
+__all__ = ["generate_3d_model", "generate_3d_model_from_image", "get_creation_details", "CreationUnavailableError", "get_creations_list", "get_user_info", "get_quota_info", "get_h3d_config", "login_with_email"]
@@ -3,8 +3,16 @@ import uuid
 
 from ..session import get_session
 
+
+class CreationUnavailableError(Exception):
+    """The API refused the creation with a client error (e.g. deleted, or not the user's): retrying will not help."""
+
+
 def get_creation_details(creations_id: str):
-    """Fetches the details of a specific 3D creation task using its ID."""
+    """
+    Fetches the details of a specific 3D creation task using its ID. Returns None when the
+    request failed, and raises CreationUnavailableError on a definitive client error.
+    """
 
     session = get_session()
 
@@ -18,9 +26,16 @@ def get_creation_details(creations_id: str):
     }
 
     try:
-        response = session.get(url, headers=headers)
+        response = session.get(url, headers=headers, timeout=15)
         response.raise_for_status() # Raise an exception for bad status codes (4xx or 5xx)
         return response.json()
+    except requests.exceptions.HTTPError as e:
+        print(f"❌ Error fetching creation details: {e}")
+        status_code = e.response.status_code if e.response is not None else 0
+        # Timeouts and rate limits are worth retrying, other client errors are not.
+        if 400 <= status_code < 500 and status_code not in (408, 429):
+            raise CreationUnavailableError(creations_id) from e
+        return None
     except requests.exceptions.RequestException as e:
         print(f"❌ Error fetching creation details: {e}")
         return None
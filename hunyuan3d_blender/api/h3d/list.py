@@ -28,7 +28,7 @@ def get_creations_list(limit: int = 20, offset: int = 0):
     }
 
     try:
-        response = session.post(url, headers=headers, json=payload)
+        response = session.post(url, headers=headers, json=payload, timeout=15)
         response.raise_for_status()  # Raise an exception for bad status codes (4xx or 5xx)
         return response.json()
     except requests.exceptions.RequestException as e:
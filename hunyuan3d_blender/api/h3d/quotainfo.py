@@ -36,7 +36,7 @@ def get_quota_info(sceneType: str = "3dCreations") -> QuotaInfo | None:
     }
 
     try:
-        response = session.post(url, headers=headers, json=payload)
+        response = session.post(url, headers=headers, json=payload, timeout=15)
         response.raise_for_status()  # Raise an exception for bad status codes (4xx or 5xx)
         data = response.json()
         
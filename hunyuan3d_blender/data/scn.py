@@ -1,9 +1,11 @@
+import os
+
 import bpy
 from bpy.types import Scene, PropertyGroup, Image, ImageTexture
 from bpy.props import PointerProperty, StringProperty, IntProperty, FloatProperty, BoolProperty, EnumProperty, CollectionProperty
 from typing import List, Dict, Any
 
-from ..utils.image import request_image_load
+from ..utils.image import request_image_load, get_preview_mip_size, image_satisfies_mip, PRIORITY_VISIBLE, PRIORITY_ADJACENT
 
 
 class H3D_PG_generation_image(PropertyGroup):
@@ -21,13 +23,22 @@ class H3D_PG_generation_image(PropertyGroup):
 
     def draw_preview(self, layout: bpy.types.UILayout, scale: int):
         if image := self.image:
+            mip_size = get_preview_mip_size(scale)
+            if not image_satisfies_mip(image, mip_size):
+                # Drawn bigger than the stored thumbnail: fetch the next mip level.
+                self.load_image(mip_size)
             if image.preview:
                 layout.template_icon(image.preview.icon_id, scale=scale)
             else:
                 # layout.prop(self, "image", text="")
                 layout.template_ID_preview(self, "image_ptr", hide_buttons=True)
 
-    def load_image(self):
+    def prefetch(self):
+        """Queues the preview behind the visible ones, e.g. for an adjacent page."""
+        if self.image_ptr is None:
+            self.load_image(priority=PRIORITY_ADJACENT)
+
+    def load_image(self, max_size: int | None = None, priority: int = PRIORITY_VISIBLE):
         def on_load_complete(image: Image):
             print(f"H3D UI: Image '{self.name}' load completed.")
             self.image = image
@@ -37,12 +48,13 @@ class H3D_PG_generation_image(PropertyGroup):
         def on_load_error():
             print(f"H3D UI: Image '{self.name}' load failed.")
 
-        if self.image_ptr is not None:
-            return
-
-        if self.filepath and os.path.exist(self.filepath) and os.path.isfile(self.filepath):
-            self.image = bpy.data.images.load(self.filepath, check_existing=True)
-            return
+        if max_size is None:
+            if self.image_ptr is not None:
+                return
+            max_size = get_preview_mip_size()
+            if self.filepath and os.path.exists(self.filepath) and os.path.isfile(self.filepath):
+                self.image = bpy.data.images.load(self.filepath, check_existing=True)
+                return
 
         if not self.url:
             return
@@ -51,7 +63,9 @@ class H3D_PG_generation_image(PropertyGroup):
             self.name,
             self.url,
             on_complete_callback=on_load_complete,
-            on_error_callback=on_load_error
+            on_error_callback=on_load_error,
+            max_size=max_size,
+            priority=priority
         )
 
     @property
@@ -308,6 +322,7 @@ class GenerationImage:
     texture: ImageTexture | None
 
     def draw_preview(self, layout: bpy.types.UILayout, scale: int): pass
+    def prefetch(self): pass
 
 class IntermediateOutput:
     gif: GenerationImage
@@ -1,6 +1,13 @@
 from bpy.types import WindowManager, PropertyGroup, Image
 from bpy.props import StringProperty, BoolProperty, PointerProperty, EnumProperty, IntProperty
 
+from ..utils.image import cancel_queued_image_requests
+
+
+def update_visible_generations(self, context):
+    # The set of visible previews changed: drop queued loads for the previous view.
+    cancel_queued_image_requests()
+
 
 class H3D_WM_Properties(PropertyGroup):
     h3d_login_type: EnumProperty(name="Login Type", default="GUEST", items=[
@@ -32,16 +39,17 @@ class H3D_WM_Properties(PropertyGroup):
         ('RENDER', "Render", "Display rendered shading", 'SHADING_RENDERED', 1),
     ))
 
-    ui_filter_generation_status: EnumProperty(name="UI Filter Generation Status", default="ALL", items=[
+    ui_filter_generation_status: EnumProperty(name="UI Filter Generation Status", default="ALL", update=update_visible_generations, items=[
         ("ALL", "All", "All", 'STRIP_COLOR_09', 0),
         ("wait", "Wait", "Wait", 'STRIP_COLOR_03', 1),
         ("fail", "Failed", "Failed", 'STRIP_COLOR_01', 2),
         ("processing", "Processing", "Processing", 'STRIP_COLOR_05', 3),
         ("success", "Success", "Success", 'STRIP_COLOR_04', 4),
     ])
-    ui_filter_generation_page_order_invert: BoolProperty(name="Page Order Invert", default=False)
+    ui_filter_generation_page_order_invert: BoolProperty(name="Page Order Invert", default=False, update=update_visible_generations)
 
     def update_ui_filter_generation_page_index(self, context):
+        update_visible_generations(self, context)
         if self.ui_filter_generation_page_index == 0:
             return
         scn_h3d = context.scene.h3d
@@ -51,6 +59,7 @@ class H3D_WM_Properties(PropertyGroup):
             self.ui_filter_generation_page_index = max_pages
         
     def update_ui_filter_generation_page_size(self, context):
+        update_visible_generations(self, context)
         if self.ui_filter_generation_page_index != 0:
             self.ui_filter_generation_page_index = 0
 
@@ -0,0 +1,33 @@
+from bpy.types import Operator
+
+from ..utils import blend_cache, image_cache, model_cache
+from ..utils.paths import get_user_dirpath
+from ..prefs import get_prefs
+
+
+class H3D_OT_clear_thumbnail_cache(Operator):
+    bl_label = "Clear Thumbnail Cache"
+    bl_idname = "h3d.clear_thumbnail_cache"
+    bl_description = "Delete every cached preview thumbnail and original image from disk"
+
+    def execute(self, context):
+        stats = image_cache.get_stats()
+        image_cache.clear()
+        self.report({'INFO'}, f"Removed {stats['entries']} cached thumbnails")
+        return {'FINISHED'}
+
+
+class H3D_OT_clear_model_cache(Operator):
+    bl_label = "Clear Model Cache"
+    bl_idname = "h3d.clear_model_cache"
+    bl_description = "Delete every cached model and converted .blend library from disk. Saved generations are not affected"
+
+    def execute(self, context):
+        model_cache_size_mb = get_prefs().model_cache_size_mb
+        model_cache.configure(get_user_dirpath("models"), model_cache_size_mb)
+        blend_cache.configure(get_user_dirpath("blend_libraries"), model_cache_size_mb)
+        stats = model_cache.get_stats()
+        model_cache.clear()
+        libraries = blend_cache.clear()
+        self.report({'INFO'}, f"Removed {stats['entries']} cached models and {libraries} libraries")
+        return {'FINISHED'}
@@ -0,0 +1,277 @@
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+
+from ..api.h3d import CreationUnavailableError, get_creation_details, get_creations_list
+
+
+# Poll interval of a creation while there is no estimate of its completion time.
+POLL_INTERVAL = 4.0
+# Bounds of the adaptive interval: rare while queued or early, frequent near completion.
+MIN_POLL_INTERVAL = 1.5
+MAX_POLL_INTERVAL = 20.0
+# Interval after failed requests doubles up to this.
+MAX_ERROR_BACKOFF = 60.0
+# A creation is given up after this many failed requests in a row (a few minutes of backoff).
+MAX_POLL_ERRORS = 8
+# The poller thread stops after this long without creations to watch.
+POLLER_IDLE_TIMEOUT = 10.0
+# Running creations are the newest ones: the list is asked for this many more, in case
+# some were created elsewhere (e.g. on the website) in the meantime.
+LIST_EXTRA_CREATIONS = 10
+# The list may lack the intermediate outputs (previews) of processing results:
+# those are refreshed with a detail request at most this often per creation.
+INTERMEDIATE_REFRESH_INTERVAL = 20.0
+
+
+@dataclass
+class PollState:
+    """Polling schedule of one creation, estimated from its progress."""
+    next_poll_time: float = 0.0
+    progress: float | None = None  # mean progress of the results, in percent
+    progress_time: float = 0.0
+    progress_rate: float = 0.0  # percent per second, smoothed
+    error_count: int = 0
+
+
+_poll_condition = threading.Condition()
+# Creation id -> schedule of the creations being polled (protected by `_poll_condition`).
+_poll_states: dict[str, PollState] = {}
+# (creation id, response) pairs waiting for the main thread. deque appends and pops are thread-safe.
+_responses: deque[tuple[str, dict]] = deque()
+# Ids of the creations given up on, waiting for the main thread.
+_abandoned: deque[str] = deque()
+_poller_thread: threading.Thread | None = None
+_stop_requested = False
+# Refresh all the watched creations with one list request (set from the preferences).
+use_batch_polling = True
+# Creation id -> time of its last detail request (poller thread only).
+_last_detail_time: dict[str, float] = {}
+
+
+def _get_list_items(response) -> list[dict]:
+    """The creations of a list response. The exact layout is not documented: look in the usual places."""
+    if isinstance(response, list):
+        return [item for item in response if isinstance(item, dict)]
+    if not isinstance(response, dict):
+        return []
+    for key in ("creations", "list", "data", "items", "records"):
+        value = response.get(key)
+        if isinstance(value, (list, dict)) and (items := _get_list_items(value)):
+            return items
+    return []
+
+
+def _get_creation_id(item: dict) -> str:
+    return str(item.get("id") or item.get("creationsId") or "")
+
+
+def _list_item_needs_details(creation_id: str, item: dict) -> bool:
+    """Whether the list item lacks fields `load_from_response` needs, so a detail request is required."""
+    results = item.get("result")
+    if "status" not in item or not isinstance(results, list):
+        return True
+    for result in results:
+        if not isinstance(result, dict) or "status" not in result or "taskId" not in result:
+            return True
+        if result["status"] == "success" and not result.get("urlResult"):
+            return True
+        if result["status"] == "processing" and "intermediate_outputs" not in result:
+            if time.monotonic() - _last_detail_time.get(creation_id, 0.0) > INTERMEDIATE_REFRESH_INTERVAL:
+                return True
+    return False
+
+
+def _get_progress(creation_details: dict) -> float | None:
+    progresses = []
+    for result in creation_details.get("result") or []:
+        if isinstance(result, dict) and result.get("status") != "fail":
+            try:
+                progresses.append(float(result.get("progress", 0.0)))
+            except (TypeError, ValueError):
+                pass
+    return sum(progresses) / len(progresses) if progresses else None
+
+
+def _schedule_next_poll(state: PollState, creation_details: dict, now: float) -> None:
+    """
+    Sets the next poll time of a creation from its new status. While it is queued, the API
+    `waitTime` tells roughly when it starts. While processing, the completion time is
+    extrapolated from the progress slope and the next poll is set halfway to it, so polls get
+    denser as completion gets closer.
+    """
+    state.error_count = 0
+    progress = _get_progress(creation_details)
+    if creation_details.get("status") == "wait" or progress is None:
+        try:
+            wait_time = float(creation_details.get("waitTime") or 0.0)
+        except (TypeError, ValueError):
+            wait_time = 0.0
+        interval = wait_time / 2.0 if wait_time > 0.0 else POLL_INTERVAL * 2.0
+    else:
+        if state.progress is None or progress < state.progress:
+            state.progress, state.progress_time = progress, now
+        elif progress > state.progress:
+            rate = (progress - state.progress) / max(now - state.progress_time, 1e-3)
+            state.progress_rate = rate if state.progress_rate == 0.0 else 0.5 * state.progress_rate + 0.5 * rate
+            state.progress, state.progress_time = progress, now
+        if state.progress_rate > 0.0:
+            remaining = (100.0 - progress) / state.progress_rate - (now - state.progress_time)
+            interval = remaining / 2.0
+        else:
+            interval = POLL_INTERVAL
+    state.next_poll_time = now + min(MAX_POLL_INTERVAL, max(MIN_POLL_INTERVAL, interval))
+
+
+def _schedule_retry(creation_id: str, state: PollState, now: float, give_up: bool = False) -> None:
+    """Backs off after a failed poll, or gives the creation up. Call with `_poll_condition` held."""
+    state.error_count += 1
+    state.next_poll_time = now + min(MAX_ERROR_BACKOFF, POLL_INTERVAL * 2 ** state.error_count)
+    if give_up or state.error_count >= MAX_POLL_ERRORS:
+        # Deleted on the website, not the user's or unreachable: stop waiting for it.
+        print(f"Giving up on creation {creation_id}, its status cannot be fetched")
+        del _poll_states[creation_id]
+        _abandoned.append(creation_id)
+
+
+def _fetch_creation_details(due_ids: list[str], watched_ids: list[str]) -> tuple[dict[str, dict], set[str]]:
+    """
+    Details of the due creations, and the ids of the ones the API refused for good. With batch
+    polling, one list request refreshes all the watched creations (the ones not due yet come for
+    free). Detail requests are only made for the due creations the list does not cover, or when
+    the list request fails.
+    """
+    fetched = {}
+    unavailable = set()
+    if use_batch_polling and len(watched_ids) > 1:
+        response = get_creations_list(limit=len(watched_ids) + LIST_EXTRA_CREATIONS)
+        for item in _get_list_items(response):
+            creation_id = _get_creation_id(item)
+            # The first status of a creation always comes from a detail request, which has every field.
+            if creation_id in _last_detail_time and creation_id in watched_ids \
+                    and not _list_item_needs_details(creation_id, item):
+                # `load_from_response` matches the generation by "id": without it, it would
+                # reload the creation from scratch and blank its creation id.
+                fetched[creation_id] = item if item.get("id") == creation_id else {**item, "id": creation_id}
+
+    for creation_id in due_ids:
+        if creation_id in fetched:
+            continue
+        with _poll_condition:
+            if _stop_requested:
+                break
+            if creation_id not in _poll_states:
+                continue
+        _last_detail_time[creation_id] = time.monotonic()
+        try:
+            creation_details = get_creation_details(creation_id)
+        except CreationUnavailableError:
+            unavailable.add(creation_id)
+            continue
+        if isinstance(creation_details, dict):
+            fetched[creation_id] = creation_details
+    return fetched, unavailable
+
+
+def _poll_due(due_ids: list[str], watched_ids: list[str]) -> None:
+    """Polls the due creations, schedules their next poll and queues the responses."""
+    fetched, unavailable = _fetch_creation_details(due_ids, watched_ids)
+
+    now = time.monotonic()
+    with _poll_condition:
+        for creation_id in set(due_ids) | set(fetched):
+            state = _poll_states.get(creation_id)
+            if state is None:
+                continue
+            if creation_id in fetched:
+                _schedule_next_poll(state, fetched[creation_id], now)
+            else:
+                _schedule_retry(creation_id, state, now, give_up=creation_id in unavailable)
+    for creation_id, creation_details in fetched.items():
+        _responses.append((creation_id, creation_details))
+
+
+def _thread_poll():
+    """
+    Fetches the details of the watched creations when their poll is due and queues the parsed
+    responses. Never touches bpy data: `generation_timer` applies the responses on the main thread.
+    """
+    global _poller_thread
+    idle_since = time.monotonic()
+    try:
+        while True:
+            with _poll_condition:
+                now = time.monotonic()
+                if _stop_requested or (not _poll_states and now - idle_since > POLLER_IDLE_TIMEOUT):
+                    return
+                if not _poll_states:
+                    _poll_condition.wait(timeout=POLLER_IDLE_TIMEOUT)
+                    continue
+                idle_since = now
+                due_ids = [creation_id for creation_id, state in _poll_states.items() if state.next_poll_time <= now]
+                if not due_ids:
+                    # `watch` wakes the thread up so new creations get a first status right away.
+                    next_poll_time = min(state.next_poll_time for state in _poll_states.values())
+                    _poll_condition.wait(timeout=next_poll_time - now)
+                    continue
+                watched_ids = list(_poll_states)
+
+            try:
+                _poll_due(due_ids, watched_ids)
+            except Exception as e:
+                # A malformed response must not stop the polling of every creation.
+                print(f"Error polling generations: {e}")
+                now = time.monotonic()
+                with _poll_condition:
+                    for creation_id in due_ids:
+                        if (state := _poll_states.get(creation_id)) is not None:
+                            _schedule_retry(creation_id, state, now)
+    finally:
+        with _poll_condition:
+            if _poller_thread is threading.current_thread():
+                _poller_thread = None
+
+
+def watch(creation_id: str) -> None:
+    """Starts polling the status of a creation, starting the poller thread if needed."""
+    global _poller_thread, _stop_requested
+    with _poll_condition:
+        _poll_states.setdefault(creation_id, PollState())
+        _stop_requested = False
+        if _poller_thread is None or not _poller_thread.is_alive():
+            _poller_thread = threading.Thread(target=_thread_poll, daemon=True)
+            _poller_thread.start()
+        _poll_condition.notify_all()
+
+
+def unwatch(creation_id: str) -> None:
+    with _poll_condition:
+        _poll_states.pop(creation_id, None)
+    _last_detail_time.pop(creation_id, None)
+
+
+def pop_responses() -> list[tuple[str, dict]]:
+    """Returns the responses received since the last call, oldest first. Main thread only."""
+    responses = []
+    while _responses:
+        responses.append(_responses.popleft())
+    return responses
+
+
+def pop_abandoned() -> list[str]:
+    """Returns the creations given up on since the last call (no longer watched). Main thread only."""
+    abandoned = []
+    while _abandoned:
+        abandoned.append(_abandoned.popleft())
+    return abandoned
+
+
+def unregister():
+    global _stop_requested
+    with _poll_condition:
+        _stop_requested = True
+        _poll_states.clear()
+        _poll_condition.notify_all()
+    _responses.clear()
+    _abandoned.clear()
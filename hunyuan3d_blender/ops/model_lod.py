@@ -0,0 +1,23 @@
+from bpy.types import Operator
+from bpy.props import IntProperty
+
+from ..utils import lod
+
+
+class H3D_OT_set_model_lod(Operator):
+    bl_label = "Set Model LOD"
+    bl_idname = "h3d.set_model_lod"
+    bl_description = "Choose the level of detail shown in the viewport for the selected models. Renders always use the full mesh"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    level: IntProperty(name="Level", description="0 is the full mesh, higher levels are lighter", default=1, min=0, max=len(lod.LOD_RATIOS))
+
+    @classmethod
+    def poll(cls, context):
+        return any(lod.LOD_LEVEL_PROP in obj for obj in context.selected_objects)
+
+    def execute(self, context):
+        for obj in context.selected_objects:
+            if lod.LOD_LEVEL_PROP in obj:
+                lod.set_lod_level(obj, min(self.level, lod.get_lod_count(obj)))
+        return {'FINISHED'}
@@ -1,5 +1,5 @@
 from bpy.types import Operator
-from bpy.props import StringProperty, BoolProperty
+from bpy.props import StringProperty, BoolProperty, EnumProperty
 
 import bpy
 import webbrowser
@@ -7,129 +7,584 @@ import requests
 import os
 import time
 import re
-from typing import Optional
+import heapq
+import itertools
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Optional
 import pathlib
 from urllib.parse import urlparse
-from collections import deque
-from threading import Thread
-from shutil import move
 
 from ..data import H3D_Data
 from ..data.scn import GenerationDetails
 from ..prefs import get_prefs
-from ..utils import TimerManager
+from ..utils import TimerManager, blend_cache, glb_loader, lod, model_cache
+from ..utils.net import POOL_DOWNLOADS, host_slot, set_background_bandwidth, set_connections_per_host, throttle_background
+from ..utils.paths import get_user_dirpath
+from ..utils.ui import ui_tag_redraw
+from ..utils.worker_pool import WorkerPool
+from ..utils.image import save_image_async, get_url_file_extension
+
+
+PRIORITY_IMPORT = 0  # explicit "Import" click, the user is waiting for it
+PRIORITY_SAVE = 1  # "Save" click, downloaded to the generations directory
+PRIORITY_BACKGROUND = 2  # prefetch of finished results into the model cache, throttled
+
+DOWNLOAD_WORKER_IDLE_TIMEOUT = 2.0
+# Background downloads run one at a time, so they never hold more than one worker and connection.
+MAX_BACKGROUND_DOWNLOADS = 1
+
+
+@dataclass
+class DownloadJob:
+    """
+    One GLB download. Requests for the same url share the job: the file is downloaded once to
+    `filepath` and linked or copied to the `extra_filepaths` of the other requests, and each
+    importing result adds its asset id to `import_asset_ids`.
+    """
+    url: str
+    filepath: str | None  # None: the model only lives in the model cache
+    asset_id: str = ""
+    priority: int = PRIORITY_SAVE
+    use_cache: bool = True  # only the main GLB of a result goes through the model cache
+    import_asset_ids: list[str] = field(default_factory=list)
+    extra_filepaths: list[str] = field(default_factory=list)
+    status: str = 'queued'  # 'queued', 'downloading', 'done' or 'failed'
+    seq: int = 0
+
+    @property
+    def key(self) -> str:
+        return self.url
+
+
+@dataclass
+class ImportJob:
+    """One downloaded GLB waiting to be imported by `_timer_import_request`."""
+    asset_id: str
+    filepath: str
+    priority: int = PRIORITY_SAVE
+    size: int = 0  # file size, to estimate the import time
+    status: str = 'queued'  # 'queued', 'importing', 'done' or 'failed'
+    seq: int = 0
+
+
+# Heap of (priority, arrival order, ImportJob), filled by the download workers.
+import_request_queue: list[tuple[int, int, ImportJob]] = []
+# Asset id -> job, while queued or importing (both protected by `_download_condition`).
+import_jobs: dict[str, ImportJob] = {}
+
+_download_condition = threading.Condition()
+# url -> job, while queued or downloading (protected by `_download_condition`).
+download_jobs: dict[str, DownloadJob] = {}
+# Batch id (generation name) -> jobs of a bulk save, to show one aggregated progress (main thread only).
+download_batches: dict[str, list[DownloadJob]] = {}
+_download_counter = itertools.count()
+
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+PARTIAL_DOWNLOAD_SUFFIX = ".part"
+# Next to a '.part' file: the ETag or Last-Modified of the response it came from, sent as If-Range
+# on resume so a changed remote file is downloaded again instead of spliced.
+RESUME_VALIDATOR_SUFFIX = ".validator"
+DOWNLOAD_RETRY_BASE_DELAY = 1.0
+DOWNLOAD_RETRY_MAX_DELAY = 8.0
+# url -> (downloaded bytes, total bytes) of the downloads in progress.
+download_progress: dict[str, tuple[int, int]] = {}
+# Prefetches stop while the model cache holds more than this (set from the preferences).
+_prefetch_disk_budget = 0
+
+# Imports run on the main thread: each timer tick imports models until this many seconds are
+# spent (at least one per tick), then gives control back to Blender so the UI stays responsive.
+IMPORT_TICK_BUDGET = 0.1
+IMPORT_TICK_INTERVAL = 0.05
+IMPORT_IDLE_INTERVAL = 0.5
+# Running estimate of the import time per MB of GLB, to decide whether another import fits in a tick.
+_import_seconds_per_mb = 0.1
+
+
+def _can_start_download(job: DownloadJob) -> bool:
+    """Call with `_download_condition` held."""
+    if job.priority < PRIORITY_BACKGROUND:
+        return True
+    running = sum(1 for other in download_jobs.values()
+                  if other.status == 'downloading' and other.priority >= PRIORITY_BACKGROUND)
+    # Only background jobs are left otherwise: the worker running one picks the next when done.
+    return running < MAX_BACKGROUND_DOWNLOADS
+
 
+def _start_download(job: DownloadJob) -> None:
+    job.status = 'downloading'
 
-download_request_queue = deque()
-thread = None
-import_request_queue = deque()
 
+def _push_download_job(job: DownloadJob) -> None:
+    """Call with `_download_condition` held."""
+    _download_pool.push(job, job.priority)
 
-saved_in_tempfiles: dict[str, str] = {}
 
+def _process_download_job(job: DownloadJob) -> None:
+    success, filepath = False, job.filepath
+    try:
+        success, filepath = _run_download_job(job)
+    finally:
+        with _download_condition:
+            # No request can join the job anymore: its destinations are final.
+            download_jobs.pop(job.key, None)
+            extra_filepaths = [path for path in job.extra_filepaths if path != filepath]
+        try:
+            if success:
+                _copy_to_extra_filepaths(filepath, extra_filepaths)
+        finally:
+            with _download_condition:
+                job.status = 'done' if success else 'failed'
+                if success:
+                    for asset_id in job.import_asset_ids:
+                        _push_import_job(asset_id, filepath, job.priority)
+
+
+def _copy_to_extra_filepaths(filepath: str, extra_filepaths: list[str]) -> None:
+    """Gives the other destinations of a shared job the downloaded file."""
+    for extra_filepath in extra_filepaths:
+        try:
+            model_cache.link_or_copy(filepath, extra_filepath)
+        except OSError as e:
+            print(f"Could not copy {filepath} to {extra_filepath}: {e}")
 
-def _thread_download_request():
-    global download_request_queue
-    while len(download_request_queue) > 0:
-        asset_id, url, filepath, do_import = download_request_queue.popleft()
-        success, filepath = download_model(url, filepath)
-        if success and do_import:
-            import_request_queue.append((asset_id, filepath))
-        time.sleep(0.5)
+
+def _run_download_job(job: DownloadJob) -> tuple[bool, str | None]:
+    """Serves the job from the model cache when possible, otherwise downloads it and caches the result."""
+    if not job.use_cache:
+        with host_slot(job.url, POOL_DOWNLOADS):
+            return download_model(job.url, job.filepath)
+
+    if cached_path := model_cache.get(job.asset_id, job.url):
+        if job.filepath is None:
+            return True, str(cached_path)
+        try:
+            model_cache.link_or_copy(cached_path, job.filepath)
+            print(f"GLB served from the model cache: {job.filepath}")
+            return True, job.filepath
+        except OSError as e:
+            print(f"Could not copy cached GLB to {job.filepath}: {e}")
+
+    if job.priority >= PRIORITY_BACKGROUND and not job.import_asset_ids:
+        if model_cache.get_stats()["size_bytes"] >= _prefetch_disk_budget:
+            print(f"Prefetch skipped, the model cache is over the prefetch budget: {job.url}")
+            return False, None
+
+    def throttle(byte_count: int):
+        # Read on every chunk: an Import click on a running prefetch lifts the limit.
+        if job.priority >= PRIORITY_BACKGROUND:
+            throttle_background(byte_count)
+
+    download_path = job.filepath or str(model_cache.get_incoming_path(job.asset_id, job.url))
+    with host_slot(job.url, POOL_DOWNLOADS):
+        success, filepath = download_model(job.url, download_path, throttle)
+    if not success:
+        return False, filepath
+    # Unsaved models are moved into the cache, saved ones are linked so both paths stay valid.
+    cached_path = model_cache.put(job.asset_id, job.url, filepath, move=job.filepath is None)
+    if job.filepath is None and cached_path is not None:
+        return True, str(cached_path)
+    return True, filepath
+
+
+def _push_import_job(asset_id: str, filepath: str, priority: int) -> None:
+    """Call with `_download_condition` held."""
+    job = import_jobs.get(asset_id)
+    if job is not None and job.status == 'queued':
+        if job.filepath == filepath and job.priority <= priority:
+            return
+        # Re-queued: drop the previous heap entry.
+        import_request_queue.remove((job.priority, job.seq, job))
+        heapq.heapify(import_request_queue)
+    try:
+        size = os.path.getsize(filepath)
+    except OSError:
+        size = 0
+    job = ImportJob(asset_id, filepath, priority, size, seq=next(_download_counter))
+    import_jobs[asset_id] = job
+    heapq.heappush(import_request_queue, (job.priority, job.seq, job))
+
+
+def _pop_import_job(elapsed: float, first: bool) -> ImportJob | None:
+    """
+    Pops the next import if it is expected to fit in what is left of the tick budget.
+    The `first` import of a tick is always popped, however big, so the queue keeps draining.
+    """
+    with _download_condition:
+        if not import_request_queue:
+            return None
+        job = import_request_queue[0][2]
+        estimate = job.size / (1024 * 1024) * _import_seconds_per_mb
+        if not first and elapsed + estimate > IMPORT_TICK_BUDGET:
+            return None
+        heapq.heappop(import_request_queue)
+        job.status = 'importing'
+        return job
+
+
+def _ensure_download_workers(worker_count: int) -> None:
+    """Starts workers up to `worker_count`, never more than the jobs waiting for one."""
+    with _download_condition:
+        _download_pool.ensure_workers(worker_count, len(download_jobs))
+
+
+# Heap of (priority, arrival order, DownloadJob). Re-prioritized jobs leave stale entries behind,
+# the workers skip them when their seq no longer matches.
+_download_pool: WorkerPool[DownloadJob] = WorkerPool(
+    _download_condition, _process_download_job, DOWNLOAD_WORKER_IDLE_TIMEOUT,
+    is_stale=lambda job: job.status != 'queued',
+    can_start=_can_start_download,
+    on_start=_start_download,
+    name="GLB downloader",
+)
+download_request_queue = _download_pool.queue
+download_workers = _download_pool.workers
 
 
 def _timer_import_request():
-    global thread, import_request_queue
-    if thread is None or not thread.is_alive():
-        return None
-    
-    while len(import_request_queue) > 0:
-        asset_id, filepath = import_request_queue.popleft()
-        import_model(asset_id, filepath)
-    
-    return 0.5
+    global _import_seconds_per_mb
+    # Refresh the download and import progress shown in the panel.
+    ui_tag_redraw("VIEW_3D", "UI")
+
+    tick_start = time.perf_counter()
+    imported_count = 0
+    while job := _pop_import_job(time.perf_counter() - tick_start, first=imported_count == 0):
+        imported_count += 1
+        import_start = time.perf_counter()
+        success = False
+        try:
+            success = import_model(job.asset_id, job.filepath)
+        except Exception as e:
+            print(f"Error importing {job.filepath}: {e}")
+        finally:
+            import_time = time.perf_counter() - import_start
+            if success and job.size > 0:
+                _import_seconds_per_mb = 0.7 * _import_seconds_per_mb + 0.3 * import_time / (job.size / (1024 * 1024))
+            with _download_condition:
+                job.status = 'done' if success else 'failed'
+                if import_jobs.get(job.asset_id) is job:
+                    del import_jobs[job.asset_id]
+
+    # Keep running until every download finished and its import was done,
+    # even if the workers already stopped.
+    with _download_condition:
+        if import_request_queue:
+            return IMPORT_TICK_INTERVAL
+        if download_jobs or download_workers:
+            return IMPORT_IDLE_INTERVAL
+    return None
 
 
 def import_model(name: str, filepath: str) -> bool:
-    if os.path.exists(filepath):
-        print(f"Attempting to import GLB: {filepath}")
-        bpy.ops.import_scene.gltf(filepath=filepath)
-        bpy.context.active_object.name = name
-        return True
-    else:
+    if not os.path.exists(filepath):
         print(f"ERROR: GLB file not found at {filepath}")
         return False
 
-
-def download_model(url: str, download_path: Optional[str] = None) -> tuple[bool, str | None]:
+    collection = bpy.context.collection
+    prefs = get_prefs()
+    use_lod = prefs.generate_lod_on_import
+    max_texture_size = int(prefs.texture_size_cap)
+    variant = ("lod" if use_lod else "") + (f"|tex{max_texture_size}" if max_texture_size else "")
+    library_path = blend_cache.get_library_path(name, filepath, variant=variant)
+    if library_path is not None and library_path.is_file():
+        # Imported before: append the converted .blend instead of parsing the GLB again.
+        print(f"Appending cached library for {name}: {library_path}")
+        objects = blend_cache.append_library(library_path, collection)
+        if objects:
+            for obj in bpy.context.selected_objects:
+                obj.select_set(False)
+            for obj in objects:
+                obj.select_set(True)
+            root = next((obj for obj in objects if obj.parent is None), objects[0])
+            bpy.context.view_layer.objects.active = root
+            if lod.LOD_LEVEL_PROP not in root:
+                root.name = name
+            return True
+
+    print(f"Attempting to import GLB: {filepath}")
+    objects_before = set(bpy.data.objects)
+    imported = False
+    if prefs.use_fast_glb_loader:
+        try:
+            glb_loader.load_glb(filepath, collection, max_texture_size)
+            imported = True
+        except glb_loader.UnsupportedGLB as e:
+            print(f"Fast GLB loader: unsupported file ({e}), using the glTF importer")
+        except Exception as e:
+            print(f"Fast GLB loader failed ({e}), using the glTF importer")
+    if not imported:
+        # Textures are only capped by the fast loader, which decodes them anyway: doing it after
+        # the glTF importer would add a decode and re-encode pass to the import time.
+        bpy.ops.import_scene.gltf(filepath=filepath)
+        if max_texture_size and library_path is not None:
+            library_path = blend_cache.get_library_path(name, filepath, variant="lod" if use_lod else "")
+    bpy.context.active_object.name = name
+    if use_lod:
+        # Heavy meshes get decimated viewport proxies, the full mesh is only used for rendering.
+        for obj in [obj for obj in bpy.data.objects if obj not in objects_before and obj.type == 'MESH']:
+            if proxy := lod.create_lod_proxy(obj):
+                proxy.select_set(True)
+                bpy.context.view_layer.objects.active = proxy
+    if library_path is not None:
+        imported_objects = [obj for obj in bpy.data.objects if obj not in objects_before]
+        if imported_objects:
+            blend_cache.write_library(library_path, imported_objects)
+    return True
+
+
+def _read_resume_validator(part_path: str) -> str:
+    try:
+        with open(part_path + RESUME_VALIDATOR_SUFFIX, 'r', encoding='utf-8') as f:
+            return f.read().strip()
+    except OSError:
+        return ""
+
+
+def _write_resume_validator(part_path: str, response: requests.Response) -> None:
+    # Weak ETags are not allowed in If-Range: fall back to Last-Modified.
+    etag = response.headers.get('etag', '')
+    validator = etag if etag and not etag.startswith('W/') else response.headers.get('last-modified', '')
+    try:
+        if validator:
+            with open(part_path + RESUME_VALIDATOR_SUFFIX, 'w', encoding='utf-8') as f:
+                f.write(validator)
+        elif os.path.exists(part_path + RESUME_VALIDATOR_SUFFIX):
+            os.remove(part_path + RESUME_VALIDATOR_SUFFIX)
+    except OSError as e:
+        print(f"Could not store the resume validator of {part_path}: {e}")
+
+
+def _remove_partial_download(part_path: str) -> None:
+    for path in (part_path, part_path + RESUME_VALIDATOR_SUFFIX):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def download_model(url: str, download_path: Optional[str] = None,
+                   throttle: Callable[[int], None] | None = None) -> tuple[bool, str | None]:
     print(f"Attempting to download GLB from: {url}")
     
-    global saved_in_tempfiles
-    if url in saved_in_tempfiles:
-        tempfilepath = saved_in_tempfiles[url]
-        if os.path.exists(tempfilepath) and os.path.isfile(tempfilepath):
-            if not download_path:
-                # use cached, no need to re-download it lol.
-                return True, download_path
-            move(tempfilepath, download_path)
-            # from tempfiles to actual user save directory path.
-            return True, download_path
-
     attemps = 3
+    attempt_index = 0
     while attemps > 0:
+        part_path = download_path + PARTIAL_DOWNLOAD_SUFFIX if download_path else None
         try:
-            response = requests.get(url, allow_redirects=True, timeout=30)
-            response.raise_for_status()
-
-            content_disposition = response.headers.get('content-disposition')
-            filename = "downloaded_model.glb"
-            if content_disposition:
-                matches = re.findall(r'filename="?([^;"]+)"?', content_disposition)
-                if matches:
-                    filename = matches[0]
-            else:
-                parsed_url_obj = urlparse(url)
-                if parsed_url_obj.path:
-                    path_part = parsed_url_obj.path
-                    if path_part.endswith('.glb'):
-                        filename = os.path.basename(path_part)
-            
-            if not filename.lower().endswith('.glb'):
-                filename += ".glb"
-
-            if not download_path:
-                default_save_dir = bpy.app.tempdir if bpy.app.tempdir else os.getcwd()
-                download_path = os.path.join(default_save_dir, filename)
-            
-            os.makedirs(os.path.dirname(download_path), exist_ok=True)
-
-            print(f"Downloading to: {download_path}")
-            with open(download_path, 'wb') as f:
-                f.write(response.content)
-
+            # Resume a previous partial download (from an earlier attempt or session) when possible.
+            resume_from = os.path.getsize(part_path) if part_path and os.path.isfile(part_path) else 0
+            validator = _read_resume_validator(part_path) if resume_from > 0 else ""
+            if resume_from > 0 and not validator:
+                # No way to tell whether the remote file changed since: start over.
+                _remove_partial_download(part_path)
+                resume_from = 0
+            # No transfer compression: Content-Length and Range offsets must count the bytes written to disk.
+            headers = {'Accept-Encoding': 'identity'}
+            if resume_from > 0:
+                headers.update({'Range': f'bytes={resume_from}-', 'If-Range': validator})
+
+            # Stream the body: a 1.5M faces GLB should never be held in memory as a whole.
+            with requests.get(url, allow_redirects=True, timeout=30, stream=True, headers=headers) as response:
+                if response.status_code == 416:
+                    # Requested range not satisfiable: the partial file is unusable, start over.
+                    print(f"Server rejected resume at byte {resume_from}, restarting download")
+                    _remove_partial_download(part_path)
+                    continue
+                response.raise_for_status()
+
+                content_disposition = response.headers.get('content-disposition')
+                filename = "downloaded_model.glb"
+                if content_disposition:
+                    matches = re.findall(r'filename="?([^;"]+)"?', content_disposition)
+                    if matches:
+                        filename = matches[0]
+                else:
+                    parsed_url_obj = urlparse(url)
+                    if parsed_url_obj.path:
+                        path_part = parsed_url_obj.path
+                        if path_part.endswith('.glb'):
+                            filename = os.path.basename(path_part)
+
+                if not filename.lower().endswith('.glb'):
+                    filename += ".glb"
+
+                if not download_path:
+                    default_save_dir = bpy.app.tempdir if bpy.app.tempdir else os.getcwd()
+                    download_path = os.path.join(default_save_dir, filename)
+                    part_path = download_path + PARTIAL_DOWNLOAD_SUFFIX
+
+                os.makedirs(os.path.dirname(download_path), exist_ok=True)
+
+                if response.status_code == 206 and resume_from > 0:
+                    # Content-Range: bytes <start>-<end>/<total>
+                    content_range = response.headers.get('content-range', '')
+                    range_match = re.match(r'bytes (\d+)-\d+/(\d+|\*)', content_range)
+                    if not range_match or int(range_match.group(1)) != resume_from:
+                        raise IOError(f"Unexpected Content-Range '{content_range}' when resuming at byte {resume_from}")
+                    total_size = int(range_match.group(2)) if range_match.group(2) != '*' else 0
+                    file_mode = 'ab'
+                    downloaded_size = resume_from
+                    print(f"Resuming download at {resume_from} bytes: {download_path}")
+                else:
+                    # Range unsupported, remote file changed (If-Range failed) or nothing to resume:
+                    # the server sends the whole file.
+                    total_size = int(response.headers.get('content-length') or 0)
+                    file_mode = 'wb'
+                    downloaded_size = 0
+                    _write_resume_validator(part_path, response)
+                    print(f"Downloading to: {download_path}")
+                download_progress[url] = (downloaded_size, total_size)
+
+                # Write to a '.part' file and rename it when complete, so a crash
+                # never leaves a truncated GLB at the final path.
+                with open(part_path, file_mode) as f:
+                    for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                        if not chunk:
+                            continue
+                        f.write(chunk)
+                        downloaded_size += len(chunk)
+                        download_progress[url] = (downloaded_size, total_size)
+                        if throttle is not None:
+                            throttle(len(chunk))
+
+            final_size = os.path.getsize(part_path)
+            if total_size and final_size != total_size:
+                if final_size > total_size:
+                    _remove_partial_download(part_path)
+                raise IOError(f"Incomplete download: got {final_size} of {total_size} bytes")
+
+            os.replace(part_path, download_path)
+            _remove_partial_download(part_path)
             print(f"GLB downloaded successfully to {download_path}")
             return True, download_path
         except requests.exceptions.RequestException as e:
             print(f"Error downloading GLB: {e}")
         except Exception as e:
             print(f"An unexpected error occurred: {e}")
+        finally:
+            download_progress.pop(url, None)
+        # The '.part' file is kept so the next attempt resumes where this one stopped.
         attemps -= 1
+        if attemps > 0:
+            time.sleep(min(DOWNLOAD_RETRY_MAX_DELAY, DOWNLOAD_RETRY_BASE_DELAY * (2 ** attempt_index)))
+            attempt_index += 1
 
     return False, download_path
 
 
+def get_download_progress(url: str) -> tuple[int, int] | None:
+    """Returns (downloaded bytes, total bytes) of an active download, total is 0 when unknown."""
+    return download_progress.get(url)
+
+
+
+def configure_model_cache() -> None:
+    """Points the model cache to its directory and size cap. Main thread only."""
+    model_cache_size_mb = get_prefs().model_cache_size_mb
+    model_cache.configure(get_user_dirpath("models"), model_cache_size_mb)
+    blend_cache.configure(get_user_dirpath("blend_libraries"), model_cache_size_mb)
+
+
+def get_import_queue_position(asset_id: str) -> int | None:
+    """
+    Position of the asset in the import queue for the UI: 0 while it is being imported,
+    1 when it is next, and so on. None when it is not waiting for an import.
+    """
+    with _download_condition:
+        job = import_jobs.get(asset_id)
+        if job is None:
+            return None
+        if job.status != 'queued':
+            return 0
+        return 1 + sum(1 for priority, seq, _job in import_request_queue if (priority, seq) < (job.priority, job.seq))
+
+
+def get_download_job(url: str) -> DownloadJob | None:
+    """Returns the queued or running job downloading `url`, if any, for the UI."""
+    with _download_condition:
+        return download_jobs.get(url)
+
+
+def request_download_model(asset_id: str, url: str, filepath: str | None = None, do_import: bool = False,
+                           priority: int = PRIORITY_SAVE, use_cache: bool = True) -> DownloadJob:
+    """
+    Queues the download of a GLB (or any other artifact, with `use_cache=False` and a `filepath`).
+    Requests for the same url share one job, which keeps the highest priority asked for, and the
+    file is only downloaded once. `PRIORITY_IMPORT` jobs jump ahead of saves.
+    """
+    with _download_condition:
+        job = download_jobs.get(url)
+        if job is None:
+            job = DownloadJob(url, filepath, asset_id, priority, use_cache=use_cache)
+            download_jobs[job.key] = job
+            _push_download_job(job)
+        elif filepath is not None and filepath != job.filepath and filepath not in job.extra_filepaths:
+            if job.filepath is None and job.status == 'queued':
+                # Not started yet: download straight to the new destination (the cache links it).
+                job.filepath = filepath
+            else:
+                job.extra_filepaths.append(filepath)
+        if priority < job.priority:
+            job.priority = priority
+            if job.status == 'queued':
+                # The previous heap entry becomes stale (its seq no longer matches).
+                _push_download_job(job)
+        if do_import and asset_id not in job.import_asset_ids:
+            job.import_asset_ids.append(asset_id)
+
+    # Preferences are only safe to access from the main thread.
+    prefs = get_prefs()
+    set_connections_per_host(prefs.image_loader_connections_per_host)
+    configure_model_cache()
+    _ensure_download_workers(prefs.download_workers)
 
-def request_download_model(asset_id: str, url: str, filepath: str | None = None, do_import: bool = False) -> None:
-    global thread, download_request_queue
-
-    download_request_queue.append((asset_id, url, filepath, do_import))
-
-    if thread is None or not thread.is_alive():
-        thread = Thread(target=_thread_download_request)
-        thread.start()
-        
     if not TimerManager.exists('import_model_request_timer'):
         TimerManager.add('import_model_request_timer', _timer_import_request)
+    return job
+
+
+def prefetch_generation_models(generation: GenerationDetails) -> int:
+    """
+    Queues background downloads of the finished results' GLBs into the model cache, so a later
+    Import only costs the import itself. Opt-in, throttled and capped by the prefetch budgets.
+    Returns how many downloads were queued. Main thread only.
+    """
+    global _prefetch_disk_budget
+    prefs = get_prefs()
+    if not prefs.prefetch_models:
+        return 0
+    configure_model_cache()
+    set_background_bandwidth(int(prefs.prefetch_bandwidth_mb * 1024 * 1024))
+    _prefetch_disk_budget = prefs.prefetch_disk_budget_mb * 1024 * 1024
+    queued = 0
+    for result in generation.result:
+        if result.status != 'success' or not result.url_result.glb or result.saved:
+            continue
+        if model_cache.contains(result.asset_id, result.url_result.glb):
+            continue
+        request_download_model(result.asset_id, result.url_result.glb, None, False, PRIORITY_BACKGROUND)
+        queued += 1
+    return queued
+
+
+def get_download_batch_progress(batch_id: str) -> tuple[float, int, int, int] | None:
+    """
+    Returns (progress factor, finished jobs, total jobs, failed jobs) of a bulk download,
+    or None when there is none running. Finished batches are forgotten.
+    """
+    jobs = download_batches.get(batch_id)
+    if not jobs:
+        return None
+    finished = failed = 0
+    partial = 0.0
+    for job in jobs:
+        if job.status in {'done', 'failed'}:
+            finished += 1
+            failed += job.status == 'failed'
+        elif job.status == 'downloading' and (progress := download_progress.get(job.url)) and progress[1] > 0:
+            partial += progress[0] / progress[1]
+    if finished == len(jobs):
+        del download_batches[batch_id]
+        return None
+    return (finished + partial) / len(jobs), finished, len(jobs), failed
 
 
 class H3D_OT_save_result(Operator):
@@ -161,34 +616,142 @@ class H3D_OT_save_result(Operator):
 
         glb_url = result.url_result.glb
         filepath = str(dirpath / f"{result.asset_id}.glb")
-        if not self.do_import:
-            success, _output = download_model(
-                glb_url,
-                filepath,
-            )
-            if not success:
-                return {'CANCELLED'}
-        else:
-            request_download_model(
-                result.asset_id,
-                glb_url,
-                filepath,
-                self.do_import
-            )
-
-        images = (
-            # result.url_result.image.image,  # same as `intermediate_output.image.image`
-            result.url_result.gif.image,
-            result.intermediate_output.image.image,
-            result.intermediate_output.gif.image,
+        request_download_model(
+            result.asset_id,
+            glb_url,
+            filepath,
+            self.do_import,
+            PRIORITY_SAVE,
         )
-        for image in images:
-            if image:
-                image.save(filepath=str(dirpath / f"{image.name}.{image.file_format.lower()}"), save_copy=False)
+
+        # Blender only holds display-sized thumbnails, save the full resolution originals instead.
+        generation_images = (
+            # result.url_result.image,  # same as `intermediate_output.image`
+            result.url_result.gif,
+            result.intermediate_output.image,
+            result.intermediate_output.gif,
+        )
+        # Written in the background: cached original bytes when available, a PNG encoded in a worker otherwise.
+        for generation_image in generation_images:
+            if not generation_image.url and generation_image.image_ptr is None:
+                continue
+            image_filepath = str(dirpath / f"{generation_image.name}{get_url_file_extension(generation_image.url)}")
+            save_image_async(generation_image.url, image_filepath, generation_image.image_ptr)
         result.saved = True
         return {'FINISHED'}
 
 
+class H3D_OT_save_generation_artifacts(Operator):
+    bl_label = "Save Generation"
+    bl_idname = "h3d.save_generation_artifacts"
+    bl_description = "Download the chosen formats of every result of the generation to the save directory"
+
+    generation_id: StringProperty(name="Generation ID", default="", options={'SKIP_SAVE'})
+    artifacts: EnumProperty(
+        name="Formats",
+        options={'ENUM_FLAG'},
+        items=[
+            ('GLB', "GLB", "Textured model (.glb)"),
+            ('OBJ', "OBJ", "Textured model (.obj and .mtl)"),
+            ('FBX', "FBX", "Textured model (.fbx)"),
+            ('GEOMETRY_GLB', "Geometry GLB", "Untextured model (.glb)"),
+            ('TEXTURE_GLB', "Texture GLB", "Texture stage model (.glb)"),
+            ('TEXTURE_OBJ', "Texture OBJ", "Texture stage model (.obj)"),
+            ('GIF', "Turntables", "Turntable animations (.gif)"),
+            ('IMAGE', "Images", "Input and render images"),
+        ],
+        default={'GLB', 'GIF', 'IMAGE'},
+    )
+
+    # Artifact -> url_result attributes holding its urls.
+    ARTIFACT_URL_ATTRS = {
+        'OBJ': ('obj', 'mtl', 'obj_url'),
+        'FBX': ('fbx',),
+        'GEOMETRY_GLB': ('geometryGlb',),
+        'TEXTURE_GLB': ('textureGlb',),
+        'TEXTURE_OBJ': ('textureObj',),
+        'GIF': ('geometryGif', 'textureGif'),
+    }
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+    def draw(self, context):
+        self.layout.column().prop(self, "artifacts")
+
+    def execute(self, context):
+        scn_h3d = H3D_Data.SCN(context)
+        generation = scn_h3d.get_generation(self.generation_id)
+        if generation is None:
+            self.report({'ERROR'}, "Generation not found")
+            return {'CANCELLED'}
+
+        prefs = get_prefs()
+        dirpath = pathlib.Path(prefs.generations_save_dirpath) / generation.creation_id
+
+        # url -> destination, a url shared by several results is only downloaded once.
+        downloads: dict[str, tuple[str, str, bool]] = {}
+        # Two downloads to one path would write the same '.part' file concurrently.
+        used_filepaths: set[str] = set()
+        for result in generation.result:
+            if result.status != 'success':
+                continue
+            url_result = result.url_result
+            if 'GLB' in self.artifacts and url_result.glb:
+                # Same path as Save, so the model cache can link it instead of downloading.
+                downloads[url_result.glb] = (result.asset_id, str(dirpath / f"{result.asset_id}.glb"), True)
+                used_filepaths.add(downloads[url_result.glb][1])
+                result.saved = True
+            for artifact, attrs in self.ARTIFACT_URL_ATTRS.items():
+                if artifact not in self.artifacts:
+                    continue
+                for attr in attrs:
+                    url = getattr(url_result, attr)
+                    if not url or url in downloads:
+                        continue
+                    # Keep the server file names: .obj files reference their .mtl and textures by name.
+                    filename = os.path.basename(urlparse(url).path) or f"{attr}{get_url_file_extension(url, '')}"
+                    filepath = str(dirpath / result.asset_id / filename)
+                    if filepath in used_filepaths:
+                        # Another artifact (e.g. 'obj' and 'textureObj') has the same file name.
+                        filepath = str(dirpath / result.asset_id / attr / filename)
+                    downloads[url] = (result.asset_id, filepath, False)
+                    used_filepaths.add(filepath)
+            generation_images = []
+            if 'GIF' in self.artifacts:
+                generation_images += [url_result.gif, result.intermediate_output.gif]
+            if 'IMAGE' in self.artifacts:
+                generation_images += [url_result.image, result.intermediate_output.image]
+            for generation_image in generation_images:
+                if generation_image.url and generation_image.url not in downloads:
+                    image_filepath = str(dirpath / f"{generation_image.name}{get_url_file_extension(generation_image.url)}")
+                    if image_filepath in used_filepaths:
+                        continue
+                    downloads[generation_image.url] = (result.asset_id, image_filepath, False)
+                    used_filepaths.add(image_filepath)
+
+        if not downloads:
+            self.report({'WARNING'}, "Nothing to save for the chosen formats")
+            return {'CANCELLED'}
+
+        download_batches[generation.name] = [
+            request_download_model(asset_id, url, filepath, False, PRIORITY_SAVE, use_cache=use_cache)
+            for url, (asset_id, filepath, use_cache) in downloads.items()
+        ]
+        self.report({'INFO'}, f"Saving {len(downloads)} files to {dirpath}")
+        return {'FINISHED'}
+
+
+def get_result_images(result) -> tuple:
+    """Preview image datablocks of a result (None where not loaded)."""
+    return (
+        result.url_result.image.image_ptr,
+        result.url_result.gif.image_ptr,
+        result.intermediate_output.image.image_ptr,
+        result.intermediate_output.gif.image_ptr,
+    )
+
+
 class H3D_OT_discard_result(Operator):
     bl_label = "Discard Result"
     bl_idname = "h3d.discard_result"
@@ -207,13 +770,14 @@ class H3D_OT_discard_result(Operator):
         if result is None:
             self.report({'ERROR'}, "Result not found")
             return {'CANCELLED'}
-        images = (
-            result.url_result.image.image_ptr,
-            result.url_result.gif.image_ptr,
-            result.intermediate_output.image.image_ptr,
-            result.intermediate_output.gif.image_ptr,
-        )
-        for image in images:
+        # Results with the same preview URL share a single image datablock, across generations too:
+        # only remove the images no other result still shows.
+        still_used = set()
+        for other_generation in scn_h3d.generation_details:
+            for other_result in other_generation.result:
+                if other_result.as_pointer() != result.as_pointer():
+                    still_used.update(get_result_images(other_result))
+        for image in set(get_result_images(result)) - still_used:
             if image is None:
                 continue
             bpy.data.images.remove(image, do_unlink=True, do_ui_user=True)
@@ -241,13 +805,18 @@ class H3D_OT_import_result_model(Operator):
             return {'CANCELLED'}
 
         if not result.saved:
-            # Dont use preferences but temp dir by default.
+            # Dont use preferences but the model cache by default.
             if result.url_result.glb:
+                configure_model_cache()
+                if cached_path := model_cache.get(result.asset_id, result.url_result.glb):
+                    import_model(result.asset_id, str(cached_path))
+                    return {'FINISHED'}
                 request_download_model(
                     result.asset_id,
                     result.url_result.glb,
                     None,
-                    True
+                    True,
+                    PRIORITY_IMPORT,
                 )
         else:
             prefs = get_prefs()
@@ -260,22 +829,25 @@ class H3D_OT_import_result_model(Operator):
                         result.asset_id,
                         result.url_result.glb,
                         filepath,
-                        True
+                        True,
+                        PRIORITY_IMPORT,
                     )
                     return {'FINISHED'}
                 else:
                     self.report({'ERROR'}, "Result not found")
                     return {'CANCELLED'}
 
-            bpy.ops.import_scene.gltf(filepath=filepath)
+            configure_model_cache()
+            import_model(result.asset_id, filepath)
         return {'FINISHED'}
 
 
-def purge_invalid_generations():
+def purge_invalid_generations(keep: set[str] = frozenset()):
+    """Removes the unfinished generations that cannot be resumed (every one not in `keep`)."""
     h3d_scn = H3D_Data.SCN()
     to_remove_generations: list[GenerationDetails] = []
     for generation in h3d_scn.generation_details:
-        if generation.status in {'wait', 'processing'}:
+        if generation.status in {'wait', 'processing'} and generation.creation_id not in keep:
             to_remove_generations.append(generation)
 
     if len(to_remove_generations) == 0:
@@ -285,9 +857,16 @@ def purge_invalid_generations():
 
     for gen in to_remove_generations:
         for result in gen.result:
-            bpy.ops.discard_result(generation_id=gen.name, result_id=result.name)
+            bpy.ops.h3d.discard_result(generation_id=gen.name, result_id=result.name)
         h3d_scn.remove_generation(gen.name)
 
 
-def register():
-    TimerManager.add('purge_invalid_generations', purge_invalid_generations, first_interval=2.0)
+def unregister():
+    with _download_condition:
+        for job in download_jobs.values():
+            # Running downloads finish on their own, queued ones are dropped.
+            job.import_asset_ids.clear()
+        download_jobs.clear()
+        download_request_queue.clear()
+        import_request_queue.clear()
+        import_jobs.clear()
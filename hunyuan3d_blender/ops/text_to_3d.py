@@ -1,22 +1,60 @@
+import math
 import os
 import tempfile
+import threading
+import time
 
 import bpy
+from bpy.app.handlers import persistent
 from bpy.types import Operator
 from bpy.props import StringProperty, IntProperty, BoolProperty
 from collections import deque
-from ..api.h3d import generate_3d_model, generate_3d_model_from_image, get_creation_details
-from ..utils import TimerManager
+from ..api.h3d import generate_3d_model, generate_3d_model_from_image, get_quota_info
+from ..utils import TimerManager, generation_journal
+from ..utils.paths import get_user_dirpath
 from ..data import H3D_Data
+from ..prefs import get_prefs
 from ..data.scn import GenerationDetails
 from ..utils.ui import ui_tag_redraw
+from .result_management import prefetch_generation_models, purge_invalid_generations
+from . import generation_poller
 
 
 currently_processing_count = 0
 generation_queue = deque()
 timer_id = "generation_timer"
+# The timer only applies responses received by the poller thread, so it can run often.
+GENERATION_TIMER_INTERVAL = 0.5
 running_generations: dict[str, GenerationDetails] = {}
 
+# Remaining quota is looked up again when older than this.
+QUOTA_REFRESH_INTERVAL = 60.0
+# Submissions pause this long when the quota runs out.
+QUOTA_RETRY_INTERVAL = 60.0
+# Used for the queue ETA until a generation was timed.
+DEFAULT_GENERATION_TIME = 180.0
+
+# Submissions run on their own threads: (session, queued data, creation id or None, whether the
+# quota was exhausted) are handed back to `generation_timer`. deque appends and pops are thread-safe.
+submitting_count = 0
+_submit_results: deque[tuple[int, dict, str | None, bool]] = deque()
+# Bumped whenever another .blend file is loaded, so submissions of a closed file are told apart.
+_session = 0
+# Session -> .blend file path of the closed files that still had submissions running, and their count.
+_closed_session_filepaths: dict[int, str] = {}
+_closed_submitting_count = 0
+_quota_lock = threading.Lock()
+# Remaining quota from the last lookup minus the submissions since, None when unknown.
+_remaining_quota: int | None = None
+_remaining_quota_time = 0.0
+_quota_blocked_until = 0.0
+# Creation id -> submission time, and a running average of the generation time (main thread only).
+_generation_start_times: dict[str, float] = {}
+_average_generation_time: float | None = None
+# .blend file path the journal entries of this session were last written under.
+# None until the session of the open file was restored: nothing is journaled before that.
+_journal_blend_filepath: str | None = None
+
 
 def get_all_running_generations() -> dict[str, GenerationDetails]:
     global running_generations
@@ -28,46 +66,221 @@ def get_queue_count() -> int:
 
 def get_currently_processing_count() -> int:
     global currently_processing_count
-    return currently_processing_count
+    return currently_processing_count + submitting_count
 
+def get_queue_eta() -> float | None:
+    """Estimated seconds until the last queued generation finishes, None when the queue is empty."""
+    if not generation_queue:
+        return None
+    limit = get_prefs().max_concurrent_generations
+    generation_time = _average_generation_time or DEFAULT_GENERATION_TIME
+    # Queued jobs start in waves as running ones finish.
+    waves = math.ceil((len(generation_queue) + currently_processing_count + submitting_count) / limit)
+    return waves * generation_time + max(0.0, _quota_blocked_until - time.monotonic())
 
-def generation_timer():
-    global currently_processing_count, generation_queue, running_generations
-    if currently_processing_count < 3:
-        if len(generation_queue) > 0:
-            data = generation_queue.popleft()
-            generation_type = data.pop("generation_type", "TEXT_TO_3D")
-            temp_filepath = data.pop("temp_filepath", "")
-            creation_id = None
+
+def _write_journal() -> None:
+    """
+    Journals the queue and the creations in flight. Submissions in progress are left out:
+    after a crash before their creation id is known, resubmitting could pay twice for one prompt.
+    """
+    global _journal_blend_filepath
+    if _journal_blend_filepath is None:
+        return
+    blend_filepath = bpy.data.filepath
+    generation_journal.save_session(blend_filepath, list(generation_queue), list(running_generations), _journal_blend_filepath)
+    _journal_blend_filepath = blend_filepath
+
+
+def _close_session() -> None:
+    """
+    Forgets the state of the previously open file: its entries are already journaled, and its
+    generations (PropertyGroups of the old scene) are freed once another file is loaded. Its
+    running submissions are journaled under it when they finish (see `_collect_submissions`).
+    """
+    global currently_processing_count, submitting_count, _closed_submitting_count, _session
+    for creation_id in running_generations:
+        generation_poller.unwatch(creation_id)
+    running_generations.clear()
+    _generation_start_times.clear()
+    generation_queue.clear()
+    currently_processing_count = 0
+    if submitting_count:
+        _closed_session_filepaths[_session] = _journal_blend_filepath
+        _closed_submitting_count += submitting_count
+    submitting_count = 0
+    _session += 1
+
+
+def restore_generations():
+    """
+    Startup timer and file load handler: reattaches to the creations still running on the server (in the scene or in the
+    journal) and resumes polling them, and restores the journaled queue. Main thread only.
+    """
+    global currently_processing_count, _journal_blend_filepath
+    if _journal_blend_filepath is not None:
+        _close_session()
+    # Otherwise this is the first restore since startup: generations queued or submitted before
+    # it belong to the open file and are kept.
+
+    generation_journal.configure(get_user_dirpath("journal"))
+    _journal_blend_filepath = bpy.data.filepath
+    queue, in_flight = generation_journal.load_session(_journal_blend_filepath)
+
+    h3d_scn = H3D_Data.SCN()
+    creation_ids = list(in_flight)
+    for generation in h3d_scn.generation_details:
+        if generation.status in {'wait', 'processing'} and generation.creation_id and generation.creation_id not in creation_ids:
+            creation_ids.append(generation.creation_id)
+    reattached = set()
+    for creation_id in creation_ids:
+        generation = h3d_scn.get_generation(creation_id)
+        if generation is not None and generation.status not in {'wait', 'processing'}:
+            continue  # finished before the crash, the journal was not updated
+        if creation_id not in running_generations:
+            # Not in the scene when the .blend was not saved: the first status fills it in.
+            running_generations[creation_id] = generation if generation is not None else h3d_scn.new_generation(creation_id)
+            currently_processing_count += 1
+            generation_poller.watch(creation_id)
+        reattached.add(creation_id)
+
+    restored_count = 0
+    for data in queue:
+        if data.get("generation_type") == "IMAGE_TO_3D" and not os.path.isfile(data.get("image_path", "")):
+            print(f"Dropping queued generation, its image is gone: {data.get('image_path', '')}")
+            continue
+        generation_queue.append(data)
+        restored_count += 1
+
+    if reattached or restored_count:
+        print(f"Resuming {len(reattached)} running generations and {restored_count} queued ones")
+    purge_invalid_generations(keep=reattached | set(running_generations))
+    _write_journal()
+    if (running_generations or generation_queue) and not TimerManager.exists(timer_id):
+        TimerManager.add(timer_id, generation_timer)
+    return None
+
+
+def _reserve_quota() -> bool:
+    """
+    Takes one unit of the remaining quota, looking it up when unknown or stale. When the quota
+    info is unavailable the submission goes ahead: the API still rejects it if over quota.
+    """
+    global _remaining_quota, _remaining_quota_time
+    with _quota_lock:
+        stale = _remaining_quota is None or time.monotonic() - _remaining_quota_time > QUOTA_REFRESH_INTERVAL
+    if stale:
+        # Looked up without the lock held, so a slow request never blocks the other submissions.
+        quota_info = get_quota_info()
+        with _quota_lock:
+            _remaining_quota = quota_info.remainQuota if quota_info is not None else None
+            _remaining_quota_time = time.monotonic()
+    with _quota_lock:
+        if _remaining_quota is None:
+            return True
+        if _remaining_quota <= 0:
+            return False
+        _remaining_quota -= 1
+        return True
+
+
+def _thread_submit_generation(data: dict, session: int):
+    generation_type = data.pop("generation_type", "TEXT_TO_3D")
+    temp_filepath = data.pop("temp_filepath", "")
+    creation_id = None
+    try:
+        if not _reserve_quota():
+            # Back to the queue as it was, including the temp file (not removed).
+            data["generation_type"] = generation_type
+            data["temp_filepath"] = temp_filepath
+            temp_filepath = ""
+            _submit_results.append((session, data, None, True))
+            return
+        if generation_type == "IMAGE_TO_3D":
+            creation_id = generate_3d_model_from_image(**data)
+        else:
+            creation_id = generate_3d_model(**data)
+        _submit_results.append((session, data, creation_id, False))
+    except Exception as e:
+        print(f"Error submitting generation: {e}")
+        _submit_results.append((session, data, None, False))
+    finally:
+        if temp_filepath:
             try:
-                if generation_type == "IMAGE_TO_3D":
-                    creation_id = generate_3d_model_from_image(**data)
-                else:
-                    creation_id = generate_3d_model(**data)
-            finally:
-                if temp_filepath:
-                    try:
-                        os.remove(temp_filepath)
-                    except OSError:
-                        pass
-
-            if creation_id:
-                currently_processing_count += 1
-                h3d_scn = H3D_Data.SCN()
-                running_generations[creation_id] = h3d_scn.new_generation(creation_id)
-            else:
-                print("Failed to generate 3D model")
-                return 4.0
-
-    if currently_processing_count == 0:
-        return None
+                os.remove(temp_filepath)
+            except OSError:
+                pass
+
+
+def _admit_queued_generations() -> None:
+    """Starts as many queued submissions as the concurrency limit allows. Main thread only."""
+    global submitting_count
+    if time.monotonic() < _quota_blocked_until:
+        return
+    capacity = get_prefs().max_concurrent_generations - currently_processing_count - submitting_count
+    while capacity > 0 and generation_queue:
+        data = generation_queue.popleft()
+        submitting_count += 1
+        capacity -= 1
+        threading.Thread(target=_thread_submit_generation, args=(data, _session), daemon=True).start()
+        if not generation_queue or capacity == 0:
+            _write_journal()
+
+
+def _collect_submissions() -> None:
+    """Registers the generations submitted by the submission threads. Main thread only."""
+    global currently_processing_count, submitting_count, _closed_submitting_count, _quota_blocked_until
+    if not _submit_results:
+        return
+    while _submit_results:
+        session, data, creation_id, quota_exhausted = _submit_results.popleft()
+        if session != _session:
+            _closed_submitting_count -= 1
+            blend_filepath = _closed_session_filepaths.get(session, "")
+            if _closed_submitting_count == 0:
+                _closed_session_filepaths.clear()
+            if blend_filepath != _journal_blend_filepath:
+                # Submitted from a file that is closed since: journaled under it, resumed when it is loaded again.
+                if quota_exhausted:
+                    generation_journal.add_to_session(blend_filepath, queue=[data])
+                elif creation_id:
+                    generation_journal.add_to_session(blend_filepath, in_flight=[creation_id])
+                continue
+            # The same file was loaded again: the submission belongs to it.
+        else:
+            submitting_count -= 1
+        if quota_exhausted:
+            generation_queue.appendleft(data)
+            _quota_blocked_until = time.monotonic() + QUOTA_RETRY_INTERVAL
+            print(f"No generation quota left, retrying in {QUOTA_RETRY_INTERVAL:.0f}s")
+        elif creation_id:
+            currently_processing_count += 1
+            h3d_scn = H3D_Data.SCN()
+            running_generations[creation_id] = h3d_scn.new_generation(creation_id)
+            _generation_start_times[creation_id] = time.monotonic()
+            generation_poller.watch(creation_id)
+        else:
+            print("Failed to generate 3D model")
+    _write_journal()
 
-    # get all generation details
+
+def generation_timer():
+    global currently_processing_count, generation_queue, running_generations, _average_generation_time
+    _collect_submissions()
+    _admit_queued_generations()
+
+    if currently_processing_count == 0 and submitting_count == 0:
+        return None if not generation_queue and not _closed_submitting_count else GENERATION_TIMER_INTERVAL
+
+    generation_poller.use_batch_polling = get_prefs().batch_status_polling
+
+    # Apply the generation details fetched by the poller thread.
     completed_generations = []
     invalid_generations = []
-    for creation_id, generation in running_generations.items():
-        creation_details = get_creation_details(creation_id)
-        if creation_details is None:
+    responses = generation_poller.pop_responses()
+    for creation_id, creation_details in responses:
+        generation = running_generations.get(creation_id)
+        if generation is None or creation_id in completed_generations or creation_id in invalid_generations:
             continue
         generation.load_from_response(creation_details)
         if generation.status == "success":
@@ -78,17 +291,34 @@ def generation_timer():
             currently_processing_count -= 1
 
     for creation_id in completed_generations:
-        running_generations.pop(creation_id)
+        generation_poller.unwatch(creation_id)
+        generation = running_generations.pop(creation_id)
+        if (start_time := _generation_start_times.pop(creation_id, None)) is not None:
+            generation_time = time.monotonic() - start_time
+            _average_generation_time = generation_time if _average_generation_time is None \
+                else 0.7 * _average_generation_time + 0.3 * generation_time
+        prefetch_generation_models(generation)
+
+    # The ones whose status cannot be fetched anymore (e.g. deleted on the website) are dropped like failed ones.
+    for creation_id in generation_poller.pop_abandoned():
+        if creation_id in running_generations and creation_id not in invalid_generations:
+            invalid_generations.append(creation_id)
+            currently_processing_count -= 1
 
     for creation_id in invalid_generations:
+        generation_poller.unwatch(creation_id)
+        _generation_start_times.pop(creation_id, None)
         running_generations.pop(creation_id)
         h3d_scn = H3D_Data.SCN()
         h3d_scn.remove_generation(creation_id)
 
-    # update UI
-    ui_tag_redraw("VIEW_3D", "UI")
+    if completed_generations or invalid_generations:
+        _write_journal()
 
-    return 4.0
+    if responses:
+        ui_tag_redraw("VIEW_3D", "UI")
+
+    return GENERATION_TIMER_INTERVAL
 
 
 class H3D_OT_TextTo3D(Operator):
@@ -181,7 +411,30 @@ class H3D_OT_TextTo3D(Operator):
 
     def add_to_queue(self, data: dict):
         generation_queue.append(data)
+        _write_journal()
         global timer_id
         if TimerManager.exists(timer_id):
             return
         TimerManager.add(timer_id, generation_timer)
+
+
+def _restore_generations_on_startup():
+    # The startup file may have been restored by `_on_load_post` already.
+    if _journal_blend_filepath is None:
+        restore_generations()
+    return None
+
+
+@persistent
+def _on_load_post(*_args):
+    restore_generations()
+
+
+def register():
+    TimerManager.add('restore_generations', _restore_generations_on_startup, first_interval=2.0)
+    bpy.app.handlers.load_post.append(_on_load_post)
+
+
+def unregister():
+    if _on_load_post in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(_on_load_post)
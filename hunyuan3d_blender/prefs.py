@@ -1,11 +1,11 @@
 from bpy.types import AddonPreferences, WindowManager, PropertyGroup
-from bpy.props import StringProperty, PointerProperty
+from bpy.props import StringProperty, PointerProperty, IntProperty, BoolProperty, EnumProperty, FloatProperty
 import bpy
 
 from pathlib import Path
 import json
 
-from .utils import TimerManager
+from .utils import TimerManager, image_cache, model_cache
 
 
 config_path = Path(bpy.utils.user_resource('CONFIG'))
@@ -36,6 +36,31 @@ class H3D_Preferences(AddonPreferences):
     h3d_cookie_token: StringProperty(name="Token", default="", subtype="PASSWORD", update=lambda prefs, ctx: prefs.backup_prop('h3d_cookie_token'))
     h3d_cookie_user_id: StringProperty(name="User ID", default="", update=lambda prefs, ctx: prefs.backup_prop('h3d_cookie_user_id'))
 
+    image_loader_workers: IntProperty(name="Preview Workers", description="Number of threads fetching and decoding preview images", default=4, min=1, max=16, update=lambda prefs, ctx: prefs.backup_prop('image_loader_workers'))
+    thumbnail_cache_size_mb: IntProperty(name="Thumbnail Cache Size (MB)", description="Maximum disk space used by cached preview thumbnails. Least recently used entries are evicted first", default=256, min=0, max=16384, update=lambda prefs, ctx: prefs.backup_prop('thumbnail_cache_size_mb'))
+    download_workers: IntProperty(name="Download Workers", description="Number of models downloaded at the same time", default=4, min=1, max=16, update=lambda prefs, ctx: prefs.backup_prop('download_workers'))
+    model_cache_size_mb: IntProperty(name="Model Cache Size (MB)", description="Maximum disk space used by cached models, shared across projects. Their converted .blend libraries get the same budget. Least recently used entries are evicted first", default=2048, min=0, max=262144, update=lambda prefs, ctx: prefs.backup_prop('model_cache_size_mb'))
+    max_concurrent_generations: IntProperty(name="Concurrent Generations", description="Maximum number of generations running at the same time. Queued ones are submitted as running ones finish", default=3, min=1, max=16, update=lambda prefs, ctx: prefs.backup_prop('max_concurrent_generations'))
+    batch_status_polling: BoolProperty(name="Batch Status Polling", description="Refresh all running generations with a single request to the creations list, instead of one request per generation", default=True, update=lambda prefs, ctx: prefs.backup_prop('batch_status_polling'))
+    prefetch_models: BoolProperty(name="Prefetch Finished Models", description="Download the models of finished generations into the model cache in the background, so importing them later is immediate", default=False, update=lambda prefs, ctx: prefs.backup_prop('prefetch_models'))
+    prefetch_bandwidth_mb: FloatProperty(name="Prefetch Bandwidth (MB/s)", description="Maximum download speed used by prefetches, 0 for unlimited. Imports and saves are never limited", default=2.0, min=0.0, max=1000.0, update=lambda prefs, ctx: prefs.backup_prop('prefetch_bandwidth_mb'))
+    prefetch_disk_budget_mb: IntProperty(name="Prefetch Disk Budget (MB)", description="Prefetching stops while the model cache holds more than this", default=1024, min=0, max=262144, update=lambda prefs, ctx: prefs.backup_prop('prefetch_disk_budget_mb'))
+    use_fast_glb_loader: BoolProperty(name="Fast GLB Loader", description="Build imported models directly from the GLB data instead of using the glTF importer. Files it does not support still use the glTF importer", default=False, update=lambda prefs, ctx: prefs.backup_prop('use_fast_glb_loader'))
+    generate_lod_on_import: BoolProperty(name="Viewport LOD Proxies", description="On import, build decimated copies of the model (10% and 1% of the faces) to display in the viewport. The full mesh is kept for rendering", default=False, update=lambda prefs, ctx: prefs.backup_prop('generate_lod_on_import'))
+    texture_size_cap: EnumProperty(
+        name="Texture Size Limit",
+        description="Downscale the textures of models imported by the Fast GLB Loader bigger than this, to save memory in layout work",
+        items=[
+            ('0', "Full", "Keep the textures at their original resolution"),
+            ('1024', "1K", "Limit textures to 1024 px"),
+            ('2048', "2K", "Limit textures to 2048 px"),
+            ('4096', "4K", "Limit textures to 4096 px"),
+        ],
+        default='0',
+        update=lambda prefs, ctx: prefs.backup_prop('texture_size_cap')
+    )
+    image_loader_connections_per_host: IntProperty(name="Connections per Host", description="Maximum simultaneous connections to the same server", default=4, min=1, max=16, update=lambda prefs, ctx: prefs.backup_prop('image_loader_connections_per_host'))
+
     def draw(self, context):
         layout = self.layout
         
@@ -44,6 +69,35 @@ class H3D_Preferences(AddonPreferences):
         login_box.prop(self, "h3d_cookie_user_id")
 
         layout.prop(self, "generations_save_dirpath")
+        layout.prop(self, "use_fast_glb_loader")
+        layout.prop(self, "generate_lod_on_import")
+        layout.prop(self, "texture_size_cap")
+
+        network_box = layout.box()
+        network_box.label(text="Network")
+        network_box.prop(self, "image_loader_workers")
+        network_box.prop(self, "download_workers")
+        network_box.prop(self, "image_loader_connections_per_host")
+        network_box.prop(self, "max_concurrent_generations")
+        network_box.prop(self, "batch_status_polling")
+        network_box.prop(self, "prefetch_models")
+        col = network_box.column()
+        col.active = self.prefetch_models
+        col.prop(self, "prefetch_bandwidth_mb")
+        col.prop(self, "prefetch_disk_budget_mb")
+
+        cache_box = layout.box()
+        cache_box.label(text="Cache")
+        row = cache_box.row()
+        row.prop(self, "thumbnail_cache_size_mb")
+        row.operator("h3d.clear_thumbnail_cache", text="", icon='TRASH')
+        stats = image_cache.get_stats()
+        cache_box.label(text=f"Thumbnails: {stats['entries']} ({stats['size_bytes'] / (1024 * 1024):.1f} MB), {stats['hits']} hits / {stats['misses']} misses")
+        row = cache_box.row()
+        row.prop(self, "model_cache_size_mb")
+        row.operator("h3d.clear_model_cache", text="", icon='TRASH')
+        stats = model_cache.get_stats()
+        cache_box.label(text=f"Models: {stats['entries']} ({stats['size_bytes'] / (1024 * 1024):.1f} MB), {stats['hits']} hits / {stats['misses']} misses")
 
 
 def get_prefs() -> H3D_Preferences:
@@ -64,6 +118,19 @@ def load_prefs_from_config_file():
         prefs.generations_save_dirpath = config_data.get('generations_save_dirpath', '')
         prefs.h3d_cookie_token = config_data.get('h3d_cookie_token', '')
         prefs.h3d_cookie_user_id = config_data.get('h3d_cookie_user_id', '')
+        prefs.image_loader_workers = config_data.get('image_loader_workers', 4)
+        prefs.download_workers = config_data.get('download_workers', 4)
+        prefs.image_loader_connections_per_host = config_data.get('image_loader_connections_per_host', 4)
+        prefs.thumbnail_cache_size_mb = config_data.get('thumbnail_cache_size_mb', 256)
+        prefs.model_cache_size_mb = config_data.get('model_cache_size_mb', 2048)
+        prefs.max_concurrent_generations = config_data.get('max_concurrent_generations', 3)
+        prefs.batch_status_polling = config_data.get('batch_status_polling', True)
+        prefs.prefetch_models = config_data.get('prefetch_models', False)
+        prefs.prefetch_bandwidth_mb = config_data.get('prefetch_bandwidth_mb', 2.0)
+        prefs.prefetch_disk_budget_mb = config_data.get('prefetch_disk_budget_mb', 1024)
+        prefs.use_fast_glb_loader = config_data.get('use_fast_glb_loader', False)
+        prefs.generate_lod_on_import = config_data.get('generate_lod_on_import', False)
+        prefs.texture_size_cap = config_data.get('texture_size_cap', '0')
 
 
 def register():
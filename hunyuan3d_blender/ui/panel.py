@@ -3,8 +3,10 @@ from bpy.types import Panel
 
 from ..data import H3D_Data
 from ..api.session import get_session
-from ..ops.text_to_3d import get_currently_processing_count, get_queue_count
-from ..utils.image import get_image_from_url
+from ..ops.text_to_3d import get_currently_processing_count, get_queue_count, get_queue_eta
+from ..ops.result_management import get_download_progress, get_download_job, get_download_batch_progress, get_import_queue_position
+from ..utils.image import get_image_from_url, get_image_queue_stats
+from ..utils import lod
 from ..prefs import get_prefs
 
 
@@ -22,6 +24,10 @@ class H3D_PT_Panel(Panel):
         if login_subpanel:
             self.draw_login(context, login_subpanel)
 
+        obj = context.active_object
+        if obj is not None and lod.LOD_LEVEL_PROP in obj:
+            self.draw_model_lod(context, layout, obj)
+
         session = get_session(create=False)
         if not session:
             return
@@ -35,6 +41,14 @@ class H3D_PT_Panel(Panel):
         if generation_details_subpanel:
             self.draw_generation_details(context, generation_details_subpanel)
 
+    def draw_model_lod(self, context: bpy.types.Context, layout: bpy.types.UILayout, obj: bpy.types.Object):
+        row = layout.row(align=True)
+        row.label(text="Viewport LOD", icon='MOD_DECIM')
+        current_level = obj[lod.LOD_LEVEL_PROP]
+        for level in range(lod.get_lod_count(obj) + 1):
+            op = row.operator("h3d.set_model_lod", text="Full" if level == 0 else f"{lod.LOD_RATIOS[level - 1]:.0%}", depress=(level == current_level))
+            op.level = level
+
     def draw_login(self, context: bpy.types.Context, layout: bpy.types.UILayout):
         wm_h3d = H3D_Data.WM(context)
         prefs = get_prefs()
@@ -96,7 +110,14 @@ class H3D_PT_Panel(Panel):
         process_count = get_currently_processing_count()
         queue_count = get_queue_count()
         split.label(text=f"Processing {process_count}")
-        split.label(text=f"Queue {queue_count}")
+        if (queue_eta := get_queue_eta()) is not None:
+            split.label(text=f"Queue {queue_count} (~{max(1, round(queue_eta / 60))} min)")
+        else:
+            split.label(text=f"Queue {queue_count}")
+        image_stats = get_image_queue_stats()
+        pending_images = image_stats["queued"] + image_stats["in_flight"]
+        if pending_images > 0:
+            box.label(text=f"Loading previews {pending_images} ({image_stats['workers']} workers)", icon='IMAGE_DATA')
 
         # --- Filter. ---
         filter_box = layout.box().row()
@@ -121,7 +142,9 @@ class H3D_PT_Panel(Panel):
 
         if not wm_h3d.ui_filter_generation_page_order_invert:
             generations = list(reversed(generations))
-            
+
+        page_size = wm_h3d.ui_filter_generation_page_size
+        adjacent_generations = generations[max(0, start_index - page_size):start_index] + generations[end_index:end_index + page_size]
         generations = generations[start_index:end_index]
         
         # --- List of generations. ---
@@ -153,9 +176,13 @@ class H3D_PT_Panel(Panel):
             row_left = title_box.box().row(align=False)
             row_left.alignment = 'EXPAND'
             row_left.prop(generation, 'expand_in_gen_ui', text=generation.title, icon='TRIA_DOWN' if generation.expand_in_gen_ui else 'TRIA_RIGHT', emboss=False)
-            # row_right = title_box.row(align=False)
-            # row_right.alignment = 'RIGHT'
-            # TODO: add options/ops/menu here... applied to the generation/batch.
+            if generation.status == 'success':
+                row_right = title_box.box().row(align=True)
+                op = row_right.operator("h3d.save_generation_artifacts", text="", icon='EXPORT', emboss=False)
+                op.generation_id = generation.name
+            if batch := get_download_batch_progress(generation.name):
+                factor, finished, total, failed = batch
+                col.progress(factor=factor, text=f"Saving {finished} / {total}" + (f" ({failed} failed)" if failed else ""))
 
             if not generation.expand_in_gen_ui:
                 continue
@@ -172,7 +199,7 @@ class H3D_PT_Panel(Panel):
                 # RIGHT: (preview render).
                 row = result_box.row(align=False)
                 # Left
-                # Skip this condition since both images are the same...
+                # Skip this condition since both images are the same (and share one datablock)...
                 # if result.url_result.image.url and result.url_result.image.image:
                 #     result.url_result.image.draw_preview(row, image_preview_scale)
                 if result.intermediate_output.image.url and result.intermediate_output.image.image:
@@ -202,6 +229,20 @@ class H3D_PT_Panel(Panel):
                     op.generation_id = generation.name
                     op.result_id = result.name
                 elif result.status == "success":
+                    if download := get_download_progress(result.url_result.glb):
+                        downloaded_size, total_size = download
+                        downloaded_mb = downloaded_size / (1024 * 1024)
+                        if total_size > 0:
+                            result_box.progress(factor=downloaded_size / total_size, text=f"{downloaded_mb:.1f} / {total_size / (1024 * 1024):.1f} MB")
+                        else:
+                            result_box.progress(factor=0.0, text=f"{downloaded_mb:.1f} MB")
+                    elif (job := get_download_job(result.url_result.glb)) and job.status == 'queued':
+                        result_box.label(text="Queued for download", icon='SORTTIME')
+                    elif (import_position := get_import_queue_position(result.asset_id)) is not None:
+                        if import_position == 0:
+                            result_box.label(text="Importing...", icon='IMPORT')
+                        else:
+                            result_box.label(text=f"Import queued (#{import_position})", icon='SORTTIME')
                     actions_row = result_box.row(align=True)
                     if result.saved:
                         op = actions_row.operator("h3d.import_result_model", text="Import Model", icon='IMPORT')
@@ -221,6 +262,17 @@ class H3D_PT_Panel(Panel):
                     actions_row.separator()
                     actions_row.prop(result, "fav", text="", icon='SOLO_ON' if result.fav else 'SOLO_OFF')
 
+        # Warm up the previews of the adjacent pages. Only once the visible ones were requested
+        # above, so a worker never picks an adjacent preview before them after a page change.
+        for generation in adjacent_generations:
+            if not generation.show_in_gen_ui or not generation.expand_in_gen_ui:
+                continue
+            if use_filter_status and generation.status != filter_status:
+                continue
+            for result in generation.result:
+                result.intermediate_output.image.prefetch()
+                result.url_result.gif.prefetch()
+
         # Filter.
         footer_col = layout.column(align=True)
         page_index_row = footer_col.row(align=True)
@@ -0,0 +1,96 @@
+import bpy
+
+import hashlib
+import os
+from pathlib import Path
+
+
+DEFAULT_MAX_SIZE_MB = 2048
+LIBRARY_EXTENSION = ".blend"
+
+_dirpath: Path | None = None
+_max_bytes = DEFAULT_MAX_SIZE_MB * 1024 * 1024
+
+
+def configure(dirpath: Path, max_size_mb: int) -> None:
+    global _dirpath, _max_bytes
+    _dirpath = dirpath
+    _max_bytes = max(0, int(max_size_mb)) * 1024 * 1024
+
+
+def get_library_path(asset_id: str, glb_filepath: str, variant: str = "") -> Path | None:
+    """
+    Library converted from this GLB. The size guards against a different file saved under the same asset.
+    `variant` tells apart libraries built with different import options (e.g. with LOD proxies).
+    """
+    if _dirpath is None:
+        return None
+    try:
+        glb_size = os.path.getsize(glb_filepath)
+    except OSError:
+        return None
+    key = hashlib.sha1(f"{asset_id}|{glb_size}|{variant}".encode("utf-8")).hexdigest()
+    return _dirpath / f"{key}{LIBRARY_EXTENSION}"
+
+
+def _evict(keep: Path) -> None:
+    """Removes the least recently used libraries (by mtime) until the cache fits."""
+    entries = []
+    for entry in os.scandir(_dirpath):
+        if entry.is_file() and entry.name.endswith(LIBRARY_EXTENSION):
+            stat = entry.stat()
+            entries.append((stat.st_mtime, entry.path, stat.st_size))
+    total = sum(size for _mtime, _path, size in entries)
+    for _mtime, path, size in sorted(entries):
+        if total <= _max_bytes:
+            break
+        if Path(path) == keep:
+            continue
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+
+def append_library(library_path: Path, collection: bpy.types.Collection) -> list[bpy.types.Object]:
+    """Appends every object of a cached library into `collection`. Much faster than parsing the GLB again."""
+    with bpy.data.libraries.load(str(library_path), link=False) as (data_from, data_to):
+        data_to.objects = data_from.objects
+    objects = [obj for obj in data_to.objects if obj is not None]
+    for obj in objects:
+        collection.objects.link(obj)
+    try:
+        os.utime(library_path)
+    except OSError:
+        pass
+    return objects
+
+
+def write_library(library_path: Path, objects: list[bpy.types.Object]) -> bool:
+    """Writes the imported objects (and the meshes, materials and packed images they use) to the cache."""
+    tmp_path = library_path.with_name(f"{library_path.stem}.tmp{LIBRARY_EXTENSION}")
+    try:
+        bpy.data.libraries.write(str(tmp_path), set(objects), path_remap='ABSOLUTE', compress=False)
+        os.replace(tmp_path, library_path)
+    except (OSError, RuntimeError) as e:
+        print(f"Blend cache: could not write {library_path}: {e}")
+        if tmp_path.exists():
+            os.remove(tmp_path)
+        return False
+    _evict(keep=library_path)
+    return True
+
+
+def clear() -> int:
+    if _dirpath is None:
+        return 0
+    removed = 0
+    for entry in os.scandir(_dirpath):
+        if entry.is_file() and entry.name.endswith(LIBRARY_EXTENSION):
+            try:
+                os.remove(entry.path)
+                removed += 1
+            except OSError:
+                pass
+    return removed
@@ -0,0 +1,86 @@
+"""
+On-disk journal of the generation queue and of the creations in flight, so they survive a
+crash, a reload of the addon or a restart of Blender.
+
+Entries are grouped by .blend file path ("" for an unsaved file), since generations live in
+the scene: a session only restores and rewrites the entries of its own file.
+"""
+import json
+import os
+from pathlib import Path
+
+
+JOURNAL_VERSION = 1
+JOURNAL_FILENAME = "generations.json"
+
+_filepath: Path | None = None
+
+
+def configure(dirpath: Path) -> None:
+    global _filepath
+    _filepath = dirpath / JOURNAL_FILENAME
+
+
+def _read() -> dict:
+    if _filepath is None or not _filepath.is_file():
+        return {}
+    try:
+        with _filepath.open('r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Generation journal: could not read {_filepath}: {e}")
+        return {}
+    if not isinstance(data, dict) or data.get("version") != JOURNAL_VERSION:
+        return {}
+    sessions = data.get("sessions")
+    return sessions if isinstance(sessions, dict) else {}
+
+
+def load_session(blend_filepath: str, sessions: dict | None = None) -> tuple[list[dict], list[str]]:
+    """Returns (queued generation requests, creation ids in flight) journaled for a .blend file."""
+    session = (_read() if sessions is None else sessions).get(blend_filepath)
+    if not isinstance(session, dict):
+        return [], []
+    queue = [data for data in session.get("queue", []) if isinstance(data, dict)]
+    in_flight = [str(creation_id) for creation_id in session.get("in_flight", []) if creation_id]
+    return queue, in_flight
+
+
+def save_session(blend_filepath: str, queue: list[dict], in_flight: list[str], previous_blend_filepath: str | None = None) -> None:
+    """
+    Replaces the entries of a .blend file. `previous_blend_filepath` moves them when the file
+    was saved under a new path since the last write.
+    """
+    if _filepath is None:
+        return
+    sessions = _read()
+    if previous_blend_filepath is not None:
+        sessions.pop(previous_blend_filepath, None)
+    if queue or in_flight:
+        sessions[blend_filepath] = {"queue": queue, "in_flight": in_flight}
+    else:
+        sessions.pop(blend_filepath, None)
+    _write(sessions)
+
+
+def add_to_session(blend_filepath: str, queue: list[dict] = (), in_flight: list[str] = ()) -> None:
+    """Appends entries to the ones of a .blend file, e.g. for a submission that finished after the file was closed."""
+    if _filepath is None:
+        return
+    sessions = _read()
+    old_queue, old_in_flight = load_session(blend_filepath, sessions)
+    sessions[blend_filepath] = {"queue": old_queue + list(queue), "in_flight": old_in_flight + list(in_flight)}
+    _write(sessions)
+
+
+def _write(sessions: dict) -> None:
+    """Written to a temp file first and synced, so a crash never leaves a truncated journal behind."""
+    tmp_path = _filepath.with_suffix(".tmp")
+    try:
+        with tmp_path.open('w', encoding='utf-8') as f:
+            json.dump({"version": JOURNAL_VERSION, "sessions": sessions}, f, indent=1)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, _filepath)
+    except (OSError, TypeError, ValueError) as e:
+        print(f"Generation journal: could not write {_filepath}: {e}")
@@ -0,0 +1,413 @@
+"""
+Fast loader for the simple GLBs served by Hunyuan 3D: one mesh made of triangle primitives,
+with metallic-roughness PBR materials and embedded textures.
+
+The file is memory-mapped and accessors are read as zero-copy numpy views, then the mesh is
+built with `foreach_set`. Anything outside that subset raises `UnsupportedGLB` so the caller
+can fall back to `bpy.ops.import_scene.gltf`.
+"""
+import bpy
+from mathutils import Matrix, Quaternion, Vector
+
+import json
+import mmap
+import struct
+
+import numpy as np
+
+from . import textures
+
+
+GLB_MAGIC = b"glTF"
+CHUNK_TYPE_JSON = 0x4E4F534A
+CHUNK_TYPE_BIN = 0x004E4942
+
+COMPONENT_DTYPES = {
+    5120: np.int8,
+    5121: np.uint8,
+    5122: np.int16,
+    5123: np.uint16,
+    5125: np.uint32,
+    5126: np.float32,
+}
+TYPE_SIZES = {"SCALAR": 1, "VEC2": 2, "VEC3": 3, "VEC4": 4}
+MODE_TRIANGLES = 4
+SUPPORTED_ATTRIBUTES = {"POSITION", "NORMAL", "TEXCOORD_0", "TANGENT"}  # tangents are recomputed by Blender
+IMAGE_EXTENSIONS = {"image/png": ".png", "image/jpeg": ".jpg", "image/webp": ".webp"}
+
+# glTF is Y-up, Blender is Z-up: (x, y, z) -> (x, -z, y).
+AXIS_CONVERSION = Matrix(((1, 0, 0, 0), (0, 0, -1, 0), (0, 1, 0, 0), (0, 0, 0, 1)))
+
+
+class UnsupportedGLB(Exception):
+    pass
+
+
+class GLBFile:
+    """A memory-mapped GLB. Views returned by `accessor` are only valid until `close`."""
+
+    def __init__(self, filepath: str):
+        with open(filepath, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, length = struct.unpack_from("<4sII", self._mmap, 0)
+            if magic != GLB_MAGIC or version != 2:
+                raise UnsupportedGLB("not a glTF 2.0 binary file")
+            json_length, json_type = struct.unpack_from("<II", self._mmap, 12)
+            if json_type != CHUNK_TYPE_JSON:
+                raise UnsupportedGLB("first chunk is not JSON")
+            self.json = json.loads(self._mmap[20:20 + json_length])
+            self._bin_offset = self._bin_length = 0
+            bin_header = 20 + json_length
+            if bin_header + 8 <= min(length, len(self._mmap)):
+                bin_length, bin_type = struct.unpack_from("<II", self._mmap, bin_header)
+                if bin_type == CHUNK_TYPE_BIN:
+                    self._bin_offset, self._bin_length = bin_header + 8, bin_length
+        except Exception:
+            self._mmap.close()
+            raise
+
+    def close(self) -> None:
+        try:
+            self._mmap.close()
+        except BufferError:
+            # A view is still referenced somewhere, the map is released with it.
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _buffer_view(self, index: int) -> tuple[int, int, int | None]:
+        """Returns (absolute offset, length, stride) of a buffer view inside the BIN chunk."""
+        view = self.json["bufferViews"][index]
+        if view.get("buffer", 0) != 0 or self._bin_length == 0:
+            raise UnsupportedGLB("external buffers")
+        offset = view.get("byteOffset", 0)
+        if offset + view["byteLength"] > self._bin_length:
+            raise UnsupportedGLB("buffer view out of bounds")
+        return self._bin_offset + offset, view["byteLength"], view.get("byteStride")
+
+    def buffer_view_bytes(self, index: int) -> bytes:
+        offset, length, _stride = self._buffer_view(index)
+        return self._mmap[offset:offset + length]
+
+    def accessor(self, index: int) -> np.ndarray:
+        """Zero-copy (count, components) view of an accessor, (count,) for scalars."""
+        accessor = self.json["accessors"][index]
+        if "sparse" in accessor or "bufferView" not in accessor:
+            raise UnsupportedGLB("sparse or empty accessors")
+        if accessor.get("componentType") not in COMPONENT_DTYPES:
+            raise UnsupportedGLB(f"accessor component type {accessor.get('componentType')}")
+        dtype = np.dtype(COMPONENT_DTYPES[accessor["componentType"]])
+        components = TYPE_SIZES.get(accessor.get("type"))
+        if components is None:
+            raise UnsupportedGLB(f"accessor type {accessor.get('type')}")
+        count = accessor["count"]
+        view_offset, view_length, stride = self._buffer_view(accessor["bufferView"])
+        offset = view_offset + accessor.get("byteOffset", 0)
+        element_size = dtype.itemsize * components
+        stride = stride or element_size
+        if count and (offset - view_offset) + stride * (count - 1) + element_size > view_length:
+            raise UnsupportedGLB("accessor out of bounds")
+        array = np.ndarray((count, components), dtype=dtype, buffer=self._mmap, offset=offset,
+                           strides=(stride, dtype.itemsize))
+        if accessor.get("normalized") and dtype.kind in "iu":
+            array = array.astype(np.float32) / np.float32(np.iinfo(dtype).max)
+        return array[:, 0] if components == 1 else array
+
+
+def _texture_infos(material: dict) -> list[dict]:
+    pbr = material.get("pbrMetallicRoughness", {})
+    infos = [pbr.get("baseColorTexture"), pbr.get("metallicRoughnessTexture"),
+             material.get("normalTexture"), material.get("emissiveTexture"), material.get("occlusionTexture")]
+    return [info for info in infos if info is not None]
+
+
+def check_supported(gltf: dict) -> None:
+    """Raises `UnsupportedGLB` with the reason when the file is outside what this loader handles."""
+    if gltf.get("extensionsRequired"):
+        raise UnsupportedGLB(f"required extensions {gltf['extensionsRequired']}")
+    if gltf.get("skins") or gltf.get("animations") or gltf.get("cameras"):
+        raise UnsupportedGLB("skins, animations or cameras")
+    meshes = gltf.get("meshes", [])
+    mesh_nodes = [node for node in gltf.get("nodes", []) if "mesh" in node]
+    if len(meshes) != 1 or len(mesh_nodes) != 1:
+        raise UnsupportedGLB("more than one mesh")
+    for primitive in meshes[0]["primitives"]:
+        if primitive.get("mode", MODE_TRIANGLES) != MODE_TRIANGLES:
+            raise UnsupportedGLB("non-triangle primitives")
+        if primitive.get("targets") or primitive.get("extensions"):
+            raise UnsupportedGLB("morph targets or compressed primitives")
+        attributes = set(primitive["attributes"])
+        if "POSITION" not in attributes or not attributes <= SUPPORTED_ATTRIBUTES:
+            raise UnsupportedGLB(f"attributes {sorted(attributes - SUPPORTED_ATTRIBUTES)}")
+    for material in gltf.get("materials", []):
+        if material.get("extensions") or material.get("alphaMode", "OPAQUE") != "OPAQUE":
+            raise UnsupportedGLB("material extensions or transparency")
+        pbr = material.get("pbrMetallicRoughness", {})
+        if "baseColorTexture" in pbr and pbr.get("baseColorFactor", [1.0, 1.0, 1.0, 1.0]) != [1.0, 1.0, 1.0, 1.0]:
+            raise UnsupportedGLB("tinted base color texture")
+        if "metallicRoughnessTexture" in pbr and (pbr.get("metallicFactor", 1.0), pbr.get("roughnessFactor", 1.0)) != (1.0, 1.0):
+            raise UnsupportedGLB("scaled metallic roughness texture")
+        if material.get("normalTexture", {}).get("scale", 1.0) != 1.0:
+            raise UnsupportedGLB("scaled normal texture")
+        for info in _texture_infos(material):
+            if info.get("texCoord", 0) != 0 or info.get("extensions"):
+                raise UnsupportedGLB("texture coordinates other than TEXCOORD_0")
+    for texture in gltf.get("textures", []):
+        if texture.get("source") is None or texture.get("extensions"):
+            raise UnsupportedGLB("textures without a plain source image")
+    for image in gltf.get("images", []):
+        if "bufferView" not in image or image.get("mimeType") not in IMAGE_EXTENSIONS:
+            raise UnsupportedGLB("external or unknown images")
+
+
+def _node_world_matrix(gltf: dict, node_index: int) -> Matrix:
+    parents = {child: index for index, node in enumerate(gltf.get("nodes", [])) for child in node.get("children", [])}
+    matrix = Matrix.Identity(4)
+    while node_index is not None:
+        node = gltf["nodes"][node_index]
+        if "matrix" in node:
+            # glTF matrices are column-major.
+            local = Matrix([node["matrix"][i::4] for i in range(4)])
+        else:
+            x, y, z, w = node.get("rotation", (0.0, 0.0, 0.0, 1.0))
+            local = Matrix.LocRotScale(Vector(node.get("translation", (0.0, 0.0, 0.0))),
+                                       Quaternion((w, x, y, z)),
+                                       Vector(node.get("scale", (1.0, 1.0, 1.0))))
+        matrix = local @ matrix
+        node_index = parents.get(node_index)
+    return AXIS_CONVERSION @ matrix @ AXIS_CONVERSION.inverted()
+
+
+def _prepare_images(glb: GLBFile, max_texture_size: int) -> dict[int, tuple[bytes, str]]:
+    """
+    Extracts the embedded images used by the materials and, with a `max_texture_size`,
+    downscales the bigger ones in a thread pool. Returns image index -> (encoded bytes, extension).
+    """
+    gltf = glb.json
+    image_indices = sorted({gltf["textures"][info["index"]]["source"]
+                            for material in gltf.get("materials", [])
+                            for info in _texture_infos(material)})
+    blobs = [glb.buffer_view_bytes(gltf["images"][index]["bufferView"]) for index in image_indices]
+    capped = textures.cap_images_parallel(blobs, max_texture_size)
+    prepared = {}
+    for index, blob, result in zip(image_indices, blobs, capped):
+        prepared[index] = result if result is not None else (blob, IMAGE_EXTENSIONS[gltf["images"][index]["mimeType"]])
+    return prepared
+
+
+def _load_image(glb: GLBFile, image_index: int, non_color: bool, cache: dict, prepared_images: dict[int, tuple[bytes, str]]) -> bpy.types.Image:
+    key = (image_index, non_color)
+    if key in cache:
+        return cache[key]
+    image_def = glb.json["images"][image_index]
+    data, extension = prepared_images[image_index]
+    image = textures.load_packed_image(image_def.get("name") or f"Image_{image_index}", data, extension)
+    if non_color:
+        image.colorspace_settings.name = 'Non-Color'
+    cache[key] = image
+    return image
+
+
+def _build_material(glb: GLBFile, material_index: int, image_cache: dict, prepared_images: dict[int, tuple[bytes, str]]) -> bpy.types.Material:
+    material_def = glb.json["materials"][material_index]
+    material = bpy.data.materials.new(material_def.get("name") or f"Material_{material_index}")
+    if material.node_tree is None:
+        material.use_nodes = True
+    material.use_backface_culling = not material_def.get("doubleSided", False)
+    nodes, links = material.node_tree.nodes, material.node_tree.links
+    bsdf = next((node for node in nodes if node.type == 'BSDF_PRINCIPLED'), None) or nodes.new('ShaderNodeBsdfPrincipled')
+
+    def texture_node(texture_index: int, non_color: bool, location: tuple[float, float]):
+        source = glb.json["textures"][texture_index]["source"]
+        node = nodes.new('ShaderNodeTexImage')
+        node.image = _load_image(glb, source, non_color, image_cache, prepared_images)
+        node.location = location
+        return node
+
+    pbr = material_def.get("pbrMetallicRoughness", {})
+    if info := pbr.get("baseColorTexture"):
+        tex = texture_node(info["index"], False, (-600, 300))
+        links.new(tex.outputs["Color"], bsdf.inputs["Base Color"])
+    else:
+        bsdf.inputs["Base Color"].default_value = pbr.get("baseColorFactor", [1.0, 1.0, 1.0, 1.0])
+    if info := pbr.get("metallicRoughnessTexture"):
+        tex = texture_node(info["index"], True, (-900, 0))
+        separate = nodes.new('ShaderNodeSeparateColor')
+        separate.location = (-600, 0)
+        links.new(tex.outputs["Color"], separate.inputs["Color"])
+        links.new(separate.outputs["Green"], bsdf.inputs["Roughness"])
+        links.new(separate.outputs["Blue"], bsdf.inputs["Metallic"])
+    else:
+        bsdf.inputs["Metallic"].default_value = pbr.get("metallicFactor", 1.0)
+        bsdf.inputs["Roughness"].default_value = pbr.get("roughnessFactor", 1.0)
+    if info := material_def.get("normalTexture"):
+        tex = texture_node(info["index"], True, (-900, -300))
+        normal_map = nodes.new('ShaderNodeNormalMap')
+        normal_map.uv_map = "UVMap"
+        normal_map.location = (-600, -300)
+        links.new(tex.outputs["Color"], normal_map.inputs["Color"])
+        links.new(normal_map.outputs["Normal"], bsdf.inputs["Normal"])
+    emissive_factor = material_def.get("emissiveFactor", [0.0, 0.0, 0.0])
+    if info := material_def.get("emissiveTexture"):
+        tex = texture_node(info["index"], False, (-600, -600))
+        links.new(tex.outputs["Color"], bsdf.inputs["Emission Color"])
+        bsdf.inputs["Emission Strength"].default_value = max(emissive_factor)
+    elif any(emissive_factor):
+        bsdf.inputs["Emission Color"].default_value = (*emissive_factor, 1.0)
+        bsdf.inputs["Emission Strength"].default_value = 1.0
+    return material
+
+
+def _decode_mesh(glb: GLBFile, mesh_def: dict, material_slots: dict[int, int]) -> dict[str, np.ndarray | None]:
+    """
+    Copies the mesh arrays out of the mapped file, validating every accessor, so an unsupported
+    file is rejected before any datablock exists. `material_slots` maps glTF material indices to
+    material slots.
+    """
+    primitives = mesh_def["primitives"]
+    positions = [glb.accessor(primitive["attributes"]["POSITION"]) for primitive in primitives]
+    vertex_count = sum(len(position) for position in positions)
+    has_normals = all("NORMAL" in primitive["attributes"] for primitive in primitives)
+    has_uvs = all("TEXCOORD_0" in primitive["attributes"] for primitive in primitives)
+
+    # One copy per attribute, converting axes while copying out of the mapped file.
+    coords = np.empty((vertex_count, 3), dtype=np.float32)
+    normals = np.empty((vertex_count, 3), dtype=np.float32) if has_normals else None
+    uvs = np.empty((vertex_count, 2), dtype=np.float32) if has_uvs else None
+    corner_verts, material_indices = [], []
+    vertex_offset = 0
+    for primitive, position in zip(primitives, positions):
+        if position.ndim != 2 or position.shape[1] != 3:
+            raise UnsupportedGLB("positions are not VEC3")
+        part = slice(vertex_offset, vertex_offset + len(position))
+        coords[part, 0], coords[part, 1], coords[part, 2] = position[:, 0], -position[:, 2], position[:, 1]
+        if has_normals:
+            normal = glb.accessor(primitive["attributes"]["NORMAL"])
+            if normal.shape != position.shape:
+                raise UnsupportedGLB("normals do not match the positions")
+            normals[part, 0], normals[part, 1], normals[part, 2] = normal[:, 0], -normal[:, 2], normal[:, 1]
+        if has_uvs:
+            uv = glb.accessor(primitive["attributes"]["TEXCOORD_0"])
+            if uv.shape != (len(position), 2):
+                raise UnsupportedGLB("texture coordinates do not match the positions")
+            # glTF puts the UV origin top-left, Blender bottom-left.
+            uvs[part, 0], uvs[part, 1] = uv[:, 0], 1.0 - uv[:, 1]
+        if "indices" in primitive:
+            indices = glb.accessor(primitive["indices"])
+            if indices.ndim != 1 or indices.dtype.kind != 'u':
+                raise UnsupportedGLB("indices are not unsigned scalars")
+            if len(indices) and int(indices.max()) >= len(position):
+                raise UnsupportedGLB("indices out of range")
+            indices = indices.astype(np.int32) + vertex_offset
+        else:
+            indices = np.arange(vertex_offset, vertex_offset + len(position), dtype=np.int32)
+        corner_verts.append(indices)
+        material_slot = material_slots.get(primitive.get("material"), 0)
+        material_indices.append(np.full(len(indices) // 3, material_slot, dtype=np.int32))
+        vertex_offset += len(position)
+
+    corner_verts = np.concatenate(corner_verts) if corner_verts else np.empty(0, dtype=np.int32)
+    face_count = len(corner_verts) // 3
+    material_indices = np.concatenate(material_indices) if material_indices else np.empty(0, dtype=np.int32)
+    return {
+        "coords": coords,
+        "normals": normals,
+        "uvs": uvs,
+        "corner_verts": corner_verts[:face_count * 3],
+        "material_indices": material_indices[:face_count],
+    }
+
+
+def _build_mesh(name: str, arrays: dict[str, np.ndarray | None], materials: list[bpy.types.Material]) -> bpy.types.Mesh:
+    """Builds a mesh from the arrays of `_decode_mesh`."""
+    coords, normals, uvs = arrays["coords"], arrays["normals"], arrays["uvs"]
+    corner_verts = arrays["corner_verts"]
+    face_count = len(corner_verts) // 3
+
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(len(coords))
+    mesh.vertices.foreach_set("co", coords.ravel())
+    mesh.loops.add(len(corner_verts))
+    mesh.loops.foreach_set("vertex_index", corner_verts)
+    mesh.polygons.add(face_count)
+    mesh.polygons.foreach_set("loop_start", np.arange(0, len(corner_verts), 3, dtype=np.int32))
+    for material in materials:
+        mesh.materials.append(material)
+    if materials:
+        mesh.polygons.foreach_set("material_index", arrays["material_indices"])
+    mesh.update(calc_edges=True)
+
+    if uvs is not None:
+        uv_layer = mesh.uv_layers.new(name="UVMap")
+        uv_layer.uv.foreach_set("vector", uvs[corner_verts].ravel())
+    if normals is not None:
+        mesh.polygons.foreach_set("use_smooth", np.ones(face_count, dtype=bool))
+        mesh.normals_split_custom_set_from_vertices(normals)
+    return mesh
+
+
+def _remove_datablocks(datablocks: list[bpy.types.ID]) -> None:
+    """Removes what a failed load created, so the fallback importer starts from a clean file."""
+    for datablock in reversed(datablocks):
+        try:
+            if isinstance(datablock, bpy.types.Object):
+                bpy.data.objects.remove(datablock)
+            elif isinstance(datablock, bpy.types.Mesh):
+                bpy.data.meshes.remove(datablock)
+            elif isinstance(datablock, bpy.types.Material):
+                bpy.data.materials.remove(datablock)
+            elif isinstance(datablock, bpy.types.Image):
+                bpy.data.images.remove(datablock)
+        except ReferenceError:
+            pass
+
+
+def load_glb(filepath: str, collection: bpy.types.Collection, max_texture_size: int = 0) -> list[bpy.types.Object]:
+    """
+    Builds the GLB's mesh object in `collection` and makes it the active, selected object.
+    Textures bigger than `max_texture_size` (0 = no limit) are downscaled in parallel first.
+    Raises `UnsupportedGLB` before creating anything when the file is outside the supported subset,
+    and removes what it created when building fails midway.
+    """
+    with GLBFile(filepath) as glb:
+        gltf = glb.json
+        check_supported(gltf)
+        node_index, node = next((index, node) for index, node in enumerate(gltf["nodes"]) if "mesh" in node)
+        mesh_def = gltf["meshes"][node["mesh"]]
+
+        material_slots: dict[int, int] = {}
+        for primitive in mesh_def["primitives"]:
+            material_index = primitive.get("material")
+            if material_index is not None and material_index not in material_slots:
+                material_slots[material_index] = len(material_slots)
+        mesh_arrays = _decode_mesh(glb, mesh_def, material_slots)
+        prepared_images = _prepare_images(glb, max_texture_size)
+
+        image_cache: dict = {}
+        created: list[bpy.types.ID] = []
+        try:
+            materials: list[bpy.types.Material] = []
+            for material_index in material_slots:
+                materials.append(_build_material(glb, material_index, image_cache, prepared_images))
+                created.append(materials[-1])
+            created.extend(image_cache.values())
+            mesh = _build_mesh(mesh_def.get("name") or "Mesh", mesh_arrays, materials)
+            created.append(mesh)
+            obj = bpy.data.objects.new(node.get("name") or mesh.name, mesh)
+            created.append(obj)
+            obj.matrix_world = _node_world_matrix(gltf, node_index)
+            collection.objects.link(obj)
+        except Exception:
+            created.extend(image for image in image_cache.values() if image not in created)
+            _remove_datablocks(created)
+            raise
+    for selected in bpy.context.selected_objects:
+        selected.select_set(False)
+    obj.select_set(True)
+    bpy.context.view_layer.objects.active = obj
+    return [obj]
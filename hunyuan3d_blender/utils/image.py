@@ -1,198 +1,495 @@
 import bpy
-import imageio.v3 as iio  # Use modern imageio.v3 API
 import numpy as np
+import os
+import requests
+import shutil
 import threading
 from collections import deque
+from dataclasses import dataclass, field
 import time
 from typing import Callable, Optional
+from urllib.parse import urlparse
 
+from PIL import Image as PILImage
+
+from . import image_cache
 from .timer_manager import TimerManager
+from .paths import get_user_dirpath
+from .net import host_slot, retry_with_backoff, set_connections_per_host
+from .pixels import decode_image_bytes, prepare_preview_pixels, to_blender_pixels
+from .worker_pool import WorkerPool
+
+
+FETCH_TIMEOUT = 30
+FETCH_RETRIES = 3
+WORKER_IDLE_TIMEOUT = 2.0
+# Milisegundos por tick del timer dedicados a crear imágenes en el hilo principal.
+COMMIT_BUDGET_MS = 4.0
+COMMIT_BUSY_INTERVAL = 0.01
+# Lado mayor (px) de cada nivel de mip de las previews. El panel nunca dibuja más que `template_icon(scale=12)`,
+# así que no tiene sentido guardar la imagen a resolución completa: esa solo se descarga al guardar el resultado.
+PREVIEW_MIP_SIZES = (64, 128, 256, 512)
+ICON_UNIT_PX = 20
+MAX_PREVIEW_SCALE = 12
+# Para las tiras de GIF animados: un frame de cada N del turntable.
+GIF_SHEET_FRAME_STEP = 4
+
+# Prioridades de carga (menor = antes).
+PRIORITY_VISIBLE = 0  # dibujada ahora mismo en el panel
+PRIORITY_ADJACENT = 1  # en la página anterior/siguiente, precarga
+
+
+@dataclass
+class ImageWaiter:
+    id: str
+    on_complete_callback: Optional[Callable[[bpy.types.Image], None]] = None
+    on_error_callback: Optional[Callable[[], None]] = None
+
+
+@dataclass
+class ImageRequest:
+    """
+    Una descarga por URL (y tamaño). Varias imágenes con la misma URL comparten la petición:
+    cada una es un `ImageWaiter` y todas reciben el mismo datablock al terminar.
+    """
+    url: str
+    max_size: int = 0
+    gif_frames: int = 1
+    priority: int = PRIORITY_VISIBLE
+    waiters: list[ImageWaiter] = field(default_factory=list)
+    cancelled: bool = False
+    seq: int = 0
+
+    @property
+    def key(self) -> tuple[str, int, int]:
+        return self.url, self.max_size, self.gif_frames
+
+
+processed_queue: deque[tuple[ImageRequest, tuple[np.ndarray, int, int] | None]] = deque()
+# id de imagen -> petición a la que está esperando.
+processing_images_ids: dict[str, ImageRequest] = {}
+
+_queue_condition = threading.Condition()
+# Peticiones que ningún worker ha empezado todavía (protegido por `_queue_condition`).
+_queued_requests: dict[tuple[str, int, int], ImageRequest] = {}
+# Peticiones en cola o en descarga hasta que el committer las entrega (solo hilo principal).
+_active_requests: dict[tuple[str, int, int], ImageRequest] = {}
+# URL -> nombre de la imagen compartida que ya tiene ese contenido (solo hilo principal).
+_image_names_by_url: dict[str, str] = {}
+_in_flight_count = 0
+_stats = {
+    "completed": 0,
+    "failed": 0,
+    "retries": 0,
+    "cancelled": 0,
+    "coalesced": 0,
+}
+
+
+def fetch_image_bytes(url: str) -> bytes:
+    """
+    Descarga los bytes de una imagen respetando el límite de conexiones por host.
+    Los errores transitorios (timeouts, 5xx, 429...) se reintentan con backoff exponencial.
+    """
+    def _on_retry(error: BaseException, attempt: int, delay: float):
+        with _queue_condition:
+            _stats["retries"] += 1
+        print(f"Error descargando {url}: {error}. Reintento {attempt}/{FETCH_RETRIES} en {delay:.2f}s...")
 
-# Removed requests and io as imageio will handle URL fetching and data.
+    def _fetch() -> bytes:
+        with host_slot(url):
+            response = requests.get(url, timeout=FETCH_TIMEOUT)
+            response.raise_for_status()
+            return response.content
+
+    return retry_with_backoff(_fetch, retries=FETCH_RETRIES, on_retry=_on_retry)
+
+
+def get_preview_mip_size(scale: int | None = None) -> int:
+    """
+    Nivel de mip (lado mayor en px) suficiente para dibujar una preview con `template_icon(scale=scale)`.
+    Sin `scale`, usa la escala de previews elegida en el panel. Solo desde el hilo principal.
+    """
+    if scale is None:
+        preview_scale = bpy.context.window_manager.h3d.ui_image_preview_scale
+        scale = MAX_PREVIEW_SCALE if preview_scale == 'AUTO' else int(preview_scale)
+    needed = scale * ICON_UNIT_PX * bpy.context.preferences.system.ui_scale
+    for size in PREVIEW_MIP_SIZES:
+        if size >= needed:
+            return size
+    return PREVIEW_MIP_SIZES[-1]
 
 
-process_queue = deque()
-processed_queue = deque()
-thread = None
-processing_images_ids = {}
+def image_satisfies_mip(image: bpy.types.Image, max_size: int) -> bool:
+    """True si la imagen ya tiene al menos la resolución de `max_size` (0 = resolución completa)."""
+    image_mip = image.get('h3d_mip', 0)
+    return image_mip == 0 or (max_size != 0 and image_mip >= max_size)
 
 
-def crop_transparent_or_white_edges(img: np.ndarray, margin: int = 5) -> np.ndarray:
+def load_image_pixels_from_url(id: str, url: str, max_size: int = 0, gif_frames: int = 1) -> tuple[np.ndarray, int, int] | None:
     """
-    Recorta las filas y columnas que son completamente blancas o transparentes.
-    Deja un margen configurable alrededor del contenido útil.
+    Etapa del worker: descarga, decodifica, recorta, reduce a `max_size` y da la vuelta a la imagen.
+    De los GIF animados solo se decodifica el primer frame, o una tira de `gif_frames` frames.
+    No toca `bpy.data`, por lo que es seguro llamarla desde cualquier hilo.
+    Devuelve (pixels, ancho, alto) o None si la descarga o decodificación falla.
     """
-    assert img.shape[2] == 4, "Se espera una imagen RGBA."
+    cache_name = f"{url}#{max_size}" if max_size else url
+    if gif_frames > 1:
+        cache_name += f"#frames{gif_frames}"
+    cached = image_cache.get(cache_name)
+    if cached is not None:
+        # La caché guarda el RGBA ya recortado y volteado en uint8.
+        return to_blender_pixels(cached), cached.shape[1], cached.shape[0]
+
+    print(f"Imagen '{id}': descargando y procesando con imageio desde {url}...")
+    try:
+        # Los bytes originales pueden estar en caché si la imagen ya se guardó.
+        if original_path := image_cache.get_original_path(url):
+            with open(original_path, 'rb') as f:
+                img_bytes = f.read()
+        else:
+            # Descargar los bytes (con límite de conexiones por host y reintentos) y decodificar con imageio.
+            # No se guardan en caché: los originales (GIFs de varios MB) expulsarían a las miniaturas.
+            img_bytes = fetch_image_bytes(url)
+        img_array_rgba = decode_image_bytes(id, img_bytes, gif_frames, GIF_SHEET_FRAME_STEP)
+        if img_array_rgba is None:
+            return None
+        img_flipped, pixels = prepare_preview_pixels(img_array_rgba, max_size)
+    except Exception as e:
+        print(f"Error al cargar la imagen '{id}' desde {url} con imageio: {e}")
+        return None
 
-    # Separar canales
-    r, g, b, a = img[..., 0], img[..., 1], img[..., 2], img[..., 3]
+    image_cache.put(cache_name, img_flipped)
+    return pixels, img_flipped.shape[1], img_flipped.shape[0]
 
-    # Crear una máscara donde los píxeles NO son blancos ni transparentes
-    mask = ~((r == 1.0) & (g == 1.0) & (b == 1.0) | (a == 0.0))
 
-    # Combinar por filas y columnas
-    rows = np.any(mask, axis=1)
-    cols = np.any(mask, axis=0)
+def create_image_from_pixels(id: str, pixels: np.ndarray, width: int, height: int,
+                             image: bpy.types.Image | None = None) -> bpy.types.Image | None:
+    """
+    Etapa del hilo principal: crea la imagen de Blender (o redimensiona `image`) y copia los píxeles.
+    """
+    try:
+        if image is None:
+            image = bpy.data.images.new(name=id, width=width, height=height, alpha=True)
+        elif tuple(image.size) != (width, height):
+            image.scale(width, height)
+        image.pixels.foreach_set(pixels)
+        # image.pack() # Opcional: empaqueta los datos de la imagen en el archivo .blend
+        print(f"Imagen '{id}' cargada y procesada con imageio.")
+        return image
+    except Exception as e:
+        print(f"Error al crear la imagen '{id}': {e}")
+        if image is not None and image.users == 0:
+            # Si creamos una nueva imagen y no tiene usuarios (no se asignó a nada), la eliminamos.
+            bpy.data.images.remove(image)
+        return None
 
-    # Obtener índices útiles
-    y_min, y_max = np.where(rows)[0][[0, -1]]
-    x_min, x_max = np.where(cols)[0][[0, -1]]
 
-    # Aplicar margen
-    y_min = max(0, y_min - margin)
-    y_max = min(img.shape[0] - 1, y_max + margin)
-    x_min = max(0, x_min - margin)
-    x_max = min(img.shape[1] - 1, x_max + margin)
+def save_original_image(url: str, filepath: str) -> bool:
+    """
+    Guarda la imagen original (resolución completa, bytes tal cual los sirve el servidor) en `filepath`.
+    Usa los bytes de la caché si ya se guardó antes (solo se guardan originales al guardar). Seguro desde cualquier hilo.
+    """
+    try:
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        if original_path := image_cache.get_original_path(url):
+            shutil.copyfile(original_path, filepath)
+            return True
+        img_bytes = fetch_image_bytes(url)
+        image_cache.put_original(url, img_bytes)
+        with open(filepath, 'wb') as f:
+            f.write(img_bytes)
+        return True
+    except Exception as e:
+        print(f"Error al guardar la imagen original desde {url}: {e}")
+        return False
+
+
+def snapshot_image_pixels(image: bpy.types.Image) -> tuple[np.ndarray, int, int]:
+    """
+    Copia los píxeles de una imagen de Blender a un array float32 plano (solo desde el hilo principal),
+    para codificarlos después en un worker. Devuelve (pixels, ancho, alto).
+    """
+    width, height = image.size
+    pixels = np.empty(width * height * image.channels, dtype=np.float32)
+    image.pixels.foreach_get(pixels)
+    return pixels, width, height
+
+
+def encode_png(filepath: str, pixels: np.ndarray, width: int, height: int) -> bool:
+    """
+    Codifica un snapshot de `snapshot_image_pixels` como PNG. No toca `bpy`, seguro desde cualquier hilo.
+    """
+    try:
+        channels = pixels.size // (width * height)
+        # Blender guarda las filas de abajo a arriba: se voltea de nuevo para el PNG.
+        img = np.rint(np.clip(pixels, 0.0, 1.0) * 255.0).astype(np.uint8).reshape(height, width, channels)[::-1]
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        PILImage.fromarray(np.ascontiguousarray(img), mode="RGBA" if channels == 4 else "RGB").save(filepath, format="PNG")
+        return True
+    except Exception as e:
+        print(f"Error al codificar la imagen en {filepath}: {e}")
+        return False
+
+
+def save_image_async(url: str, filepath: str, image: bpy.types.Image | None = None) -> threading.Thread:
+    """
+    Guarda una imagen sin bloquear la interfaz: los bytes originales (de la caché o descargados) en `filepath`
+    o, si no hay URL o la descarga falla, un PNG codificado a partir de los píxeles de `image`.
+    Los píxeles solo se copian (en el hilo principal) cuando no hay original; la codificación va en un worker.
+    """
+    image_name = image.name if image is not None else None
+    png_filepath = os.path.splitext(filepath)[0] + ".png"
+    saved_original = False
+
+    def _save():
+        nonlocal saved_original
+        saved_original = bool(url) and save_original_image(url, filepath)
+
+    def _save_fallback_png():
+        # Timer del hilo principal: espera al worker y, si no hubo original, copia los píxeles.
+        if thread.is_alive():
+            return 0.1
+        if saved_original or image_name is None:
+            return None
+        fallback_image = bpy.data.images.get(image_name)
+        if fallback_image is not None:
+            snapshot = snapshot_image_pixels(fallback_image)
+            threading.Thread(target=encode_png, args=(png_filepath, *snapshot), daemon=True).start()
+        return None
+
+    thread = threading.Thread(target=_save, daemon=True)
+    thread.start()
+    if image_name is not None:
+        bpy.app.timers.register(_save_fallback_png, first_interval=0.1)
+    return thread
+
 
-    # Recorte
-    return img[y_min:y_max+1, x_min:x_max+1]
+def get_url_file_extension(url: str, default: str = ".png") -> str:
+    extension = os.path.splitext(urlparse(url).path)[1].lower()
+    return extension if extension else default
 
 
 def get_image_from_url(id: str, url: str) -> bpy.types.Image | None:
     """
-    Carga una imagen desde una URL en Blender usando imageio.
+    Carga una imagen desde una URL en Blender de forma síncrona (solo desde el hilo principal).
     Si una imagen con el 'id' dado ya existe, la devuelve.
-    De lo contrario, descarga la imagen, la carga en Blender y la devuelve.
     Devuelve None si la descarga o carga falla.
     """
-    global processing_images_ids
+    image = bpy.data.images.get(id)
+    if image is not None:
+        print(f"Imagen '{id}' ya existe en Blender. Usando la existente.")
+        return image
 
-    image = bpy.data.images.get(id) 
-    
-    if image is None:
-        print(f"Imagen '{id}' no encontrada. Descargando y procesando con imageio desde {url}...")
-        new_image_created = False # Flag to track if we need to clean up a new image on failure
-        try:
-            # Leer la imagen desde la URL usando imageio
-            # imageio.v3.imread can take a URI directly
-            try:
-                img_array_raw = iio.imread(url,pilmode="RGBA") # Request RGBA to simplify channel handling
-            except TimeoutError as e:
-                print(e)
-                print("Trying again...")
-                time.sleep(0.15)
-                img_array_raw = iio.imread(url,pilmode="RGBA")
-
-            # imageio might return different dtypes, Blender pixels usually expect float32 (0.0 to 1.0)
-            if img_array_raw.dtype == np.uint8:
-                img_array_float = img_array_raw.astype(np.float32) / 255.0
-            elif img_array_raw.dtype == np.uint16:
-                img_array_float = img_array_raw.astype(np.float32) / 65535.0
-            elif img_array_raw.dtype == np.float32:
-                # Assume it's already in 0-1 range if float32, or clamp/normalize if necessary
-                img_array_float = np.clip(img_array_raw, 0.0, 1.0) # Ensure it's in 0-1 range
-            else:
-                print(f"Error: Tipo de dato no soportado por imageio: {img_array_raw.dtype} para la imagen '{id}'. Intentando convertir.")
-                # Fallback: try to convert to uint8 first then to float
-                img_array_float = iio.imread(url, mode='RGBA', pilmode="RGBA").astype(np.float32) / 255.0
-
-            # Ensure we have 4 channels (RGBA)
-            if len(img_array_float.shape) == 3 and img_array_float.shape[2] == 3: # RGB
-                print(f"  Imagen '{id}' es RGB, añadiendo canal alfa.")
-                alpha_channel = np.ones((height, width, 1), dtype=np.float32)
-                img_array_rgba = np.concatenate((img_array_float, alpha_channel), axis=2)
-            elif len(img_array_float.shape) == 3 and img_array_float.shape[2] == 4: # RGBA
-                img_array_rgba = img_array_float
-            elif len(img_array_float.shape) == 2: # Grayscale
-                print(f"  Imagen '{id}' es escala de grises, convirtiendo a RGBA.")
-                img_array_gray_3channel = np.stack((img_array_float,)*3, axis=-1) # HxW -> HxWx3
-                alpha_channel = np.ones((height, width, 1), dtype=np.float32)
-                img_array_rgba = np.concatenate((img_array_gray_3channel, alpha_channel), axis=2)
-            else:
-                print(f"Error: Número de canales no soportado ({img_array_float.shape}) para la imagen '{id}' tras conversión.")
-                return None
+    result = load_image_pixels_from_url(id, url)
+    if result is None:
+        return None
+    return create_image_from_pixels(id, *result)
 
-            img_array_rgba = crop_transparent_or_white_edges(img_array_rgba, margin=5)
-            height, width = img_array_rgba.shape[0], img_array_rgba.shape[1]
 
-            image = bpy.data.images.new(name=id, width=width, height=height, alpha=True)
-            new_image_created = True
-
-            # Blender expects pixels from bottom-left, some image formats are top-left.
-            # imageio.imread with default plugins usually gives top-left (standard for many formats).
-            # So, we might need to flip it vertically.
-            # However, bpy.types.Image.pixels expects a 1D array (R,G,B,A,R,G,B,A...)
-            # and seems to handle the y-inversion internally or expects top-to-bottom rows.
-            # Let's try direct assignment first. If inverted, uncomment flipud.
-            img_array_rgba_flipped = np.flipud(img_array_rgba)
-            image.pixels.foreach_set(img_array_rgba_flipped.ravel())
-
-            # image.pack() # Opcional: empaqueta los datos de la imagen en el archivo .blend
-
-            print(f"Imagen '{id}' cargada y procesada con imageio.")
-
-        except Exception as e:
-            print(f"Error al cargar la imagen '{id}' desde {url} con imageio: {e}")
-            if new_image_created and image and image.users == 0 : 
-                # Si creamos una nueva imagen y no tiene usuarios (no se asignó a nada), la eliminamos.
-                bpy.data.images.remove(image)
-            if id in processing_images_ids:
-                del processing_images_ids[id]
-            return None
-    else:
-        print(f"Imagen '{id}' ya existe en Blender. Usando la existente.")
-        if id in processing_images_ids:
-            del processing_images_ids[id]
-
-    return image
+def find_image_by_url(url: str, id: str | None = None) -> bpy.types.Image | None:
+    """
+    Busca la imagen (compartida) que ya tiene el contenido de `url`, o en su defecto la llamada `id`.
+    Solo desde el hilo principal.
+    """
+    name = _image_names_by_url.get(url)
+    if name is not None:
+        image = bpy.data.images.get(name)
+        if image is not None and image.get('url') == url:
+            return image
+        del _image_names_by_url[url]
+    if id is not None:
+        return bpy.data.images.get(id)
+    return None
 
 
 def wait_for_image_processing():
-    global processed_queue
+    """
+    Committer del hilo principal: crea las imágenes terminadas por los workers
+    sin superar `COMMIT_BUDGET_MS` por tick del timer. Lo que no cabe se queda para el siguiente tick.
+    Todas las peticiones con la misma URL reciben el mismo datablock.
+    """
+    global processed_queue, processing_images_ids
+    deadline = time.perf_counter() + COMMIT_BUDGET_MS / 1000.0
     while len(processed_queue) > 0:
-        id, image, on_complete_callback, on_error_callback = processed_queue.popleft()
+        request, result = processed_queue.popleft()
+        if _active_requests.get(request.key) is request:
+            del _active_requests[request.key]
+
+        image = find_image_by_url(request.url, request.waiters[0].id)
+        if result is not None and (image is None or not image_satisfies_mip(image, request.max_size)):
+            is_upgrade = image is not None
+            image = create_image_from_pixels(request.waiters[0].id, *result, image=image)
+            if image is not None:
+                image['h3d_mip'] = request.max_size
+                if is_upgrade and image.preview:
+                    image.preview.reload()
         if image is not None:
-            if on_complete_callback is not None and callable(on_complete_callback):
-                on_complete_callback(image)
-        else:
-            if on_error_callback is not None and callable(on_error_callback):
-                on_error_callback()
-        global processing_images_ids
-        if id in processing_images_ids:
-            del processing_images_ids[id]
-
-    global thread
-    if thread is None or not thread.is_alive():
+            image['url'] = request.url
+            _image_names_by_url[request.url] = image.name
+
+        for waiter in request.waiters:
+            if image is not None:
+                if waiter.on_complete_callback is not None and callable(waiter.on_complete_callback):
+                    waiter.on_complete_callback(image)
+            else:
+                if waiter.on_error_callback is not None and callable(waiter.on_error_callback):
+                    waiter.on_error_callback()
+            if processing_images_ids.get(waiter.id) is request:
+                del processing_images_ids[waiter.id]
+
+        if time.perf_counter() >= deadline:
+            break
+
+    if len(processed_queue) > 0:
+        # Budget agotado: seguimos en el próximo ciclo del event loop.
+        return COMMIT_BUSY_INTERVAL
+    if not any(worker.is_alive() for worker in workers):
         return None
-    return 0.5
-
-def process_image_thread():
-    global process_queue, processed_queue
-    while len(process_queue) > 0:
-        id, url, on_complete_callback, on_error_callback = process_queue.popleft()
-        image = get_image_from_url(id, url)
-        print("Thread: image was processed", image)
-        processed_queue.append((id, image, on_complete_callback, on_error_callback))
-        time.sleep(0.15)
-
-    global thread
-    thread = None
-    return None
+    return 0.1
+
+
+def _start_request(request: ImageRequest) -> None:
+    """Un worker ha sacado la petición de la cola. Se llama con `_queue_condition` adquirido."""
+    global _in_flight_count
+    del _queued_requests[request.key]
+    _in_flight_count += 1
+
+
+def _process_request(request: ImageRequest) -> None:
+    global _in_flight_count
+    result = None
+    try:
+        result = load_image_pixels_from_url(request.waiters[0].id, request.url, request.max_size, request.gif_frames)
+    finally:
+        with _queue_condition:
+            _in_flight_count -= 1
+            _stats["completed" if result is not None else "failed"] += 1
+        processed_queue.append((request, result))
+
+
+# Heap de (prioridad, orden de llegada, ImageRequest). Las peticiones canceladas o
+# re-priorizadas dejan entradas obsoletas en el heap que los workers descartan al sacarlas.
+_pool: WorkerPool[ImageRequest] = WorkerPool(
+    _queue_condition, _process_request, WORKER_IDLE_TIMEOUT,
+    is_stale=lambda request: request.cancelled,
+    on_start=_start_request,
+    name="Preview loader",
+)
+process_queue = _pool.queue
+workers = _pool.workers
+
+
+def _push_request(request: ImageRequest) -> None:
+    """Llamar con `_queue_condition` adquirido."""
+    _queued_requests[request.key] = request
+    _pool.push(request, request.priority)
+
+
+def _reprioritize_request(request: ImageRequest, priority: int) -> None:
+    """Sube la prioridad de una petición que sigue en cola (p. ej. una precarga que ahora es visible)."""
+    with _queue_condition:
+        if request.priority <= priority or _queued_requests.get(request.key) is not request:
+            return
+        request.priority = priority
+        # La entrada anterior del heap queda obsoleta (su seq ya no coincide).
+        _push_request(request)
+
+
+def cancel_queued_image_requests() -> int:
+    """
+    Cancela todas las peticiones que aún no ha empezado ningún worker (las que están en
+    descarga terminan normalmente). Se llama al cambiar de página: lo que siga siendo
+    visible lo vuelve a pedir el siguiente redibujado del panel, ya con la prioridad correcta.
+    Devuelve cuántas se cancelaron.
+    """
+    with _queue_condition:
+        cancelled = list(_queued_requests.values())
+        _queued_requests.clear()
+        process_queue.clear()
+        _stats["cancelled"] += len(cancelled)
+    for request in cancelled:
+        request.cancelled = True
+        if _active_requests.get(request.key) is request:
+            del _active_requests[request.key]
+        for waiter in request.waiters:
+            if processing_images_ids.get(waiter.id) is request:
+                del processing_images_ids[waiter.id]
+    return len(cancelled)
+
+
+def _ensure_workers(worker_count: int) -> None:
+    """Lanza workers hasta `worker_count`, sin superar el número de peticiones pendientes."""
+    with _queue_condition:
+        _pool.ensure_workers(worker_count, len(_queued_requests) + _in_flight_count)
+
+
+def get_image_queue_stats() -> dict[str, int]:
+    """Snapshot of the preview loader queues, safe to call from the UI."""
+    with _queue_condition:
+        return {
+            "queued": len(_queued_requests),
+            "in_flight": _in_flight_count,
+            "pending_commit": len(processed_queue),
+            "workers": len(workers),
+            "completed": _stats["completed"],
+            "failed": _stats["failed"],
+            "retries": _stats["retries"],
+            "cancelled": _stats["cancelled"],
+            "coalesced": _stats["coalesced"],
+        }
 
 
 def request_image_load(id: str, url: str,
                        on_complete_callback: Optional[Callable[[bpy.types.Image], None]] = None,
-                       on_error_callback: Optional[Callable[[], None]] = None):
-    global process_queue, thread, processing_images_ids
-    
-    if id in processing_images_ids and processing_images_ids[id]:
-        return
-    processing_images_ids[id] = True
+                       on_error_callback: Optional[Callable[[], None]] = None,
+                       max_size: int = 0,
+                       gif_frames: int = 1,
+                       priority: int = PRIORITY_VISIBLE):
+    """
+    Pide cargar la imagen `id` desde `url`, reducida a `max_size` px de lado mayor (0 = resolución completa).
+    Para GIF animados, `gif_frames` > 1 genera una tira (sprite sheet) en lugar del primer frame.
+    Si ya existe con resolución suficiente no se descarga de nuevo.
+    Las peticiones `PRIORITY_VISIBLE` adelantan a las precargas de páginas adyacentes.
+    """
+    global process_queue, processing_images_ids
 
-    # Add the request to the queue
-    process_queue.append((id, url, on_complete_callback, on_error_callback))
+    if request := processing_images_ids.get(id):
+        _reprioritize_request(request, priority)
+        return
 
-    # # If no thread is running, start one...
-    if thread is None or not thread.is_alive():
-        thread = threading.Thread(target=process_image_thread)
-        thread.start()
+    waiter = ImageWaiter(id, on_complete_callback, on_error_callback)
+    image = find_image_by_url(url, id)
+    if image is not None and image_satisfies_mip(image, max_size):
+        # Ya existe: no hace falta descargarla, el committer la entrega en el próximo tick.
+        request = ImageRequest(url, max_size, gif_frames, priority, [waiter])
+        processed_queue.append((request, None))
+    elif (request := _active_requests.get((url, max_size, gif_frames))) is not None:
+        # La misma URL ya está en cola o descargándose: nos unimos a esa petición.
+        request.waiters.append(waiter)
+        _reprioritize_request(request, priority)
+        with _queue_condition:
+            _stats["coalesced"] += 1
+    else:
+        # Add the request to the queue
+        request = ImageRequest(url, max_size, gif_frames, priority, [waiter])
+        _active_requests[request.key] = request
+        with _queue_condition:
+            _push_request(request)
+    processing_images_ids[id] = request
+
+    # Pool settings are read here since preferences are only safe to access from the main thread.
+    from ..prefs import get_prefs
+    prefs = get_prefs()
+    set_connections_per_host(prefs.image_loader_connections_per_host)
+    image_cache.configure(get_user_dirpath("thumbnails"), prefs.thumbnail_cache_size_mb)
+    _ensure_workers(prefs.image_loader_workers)
 
     # If no timer is running, start one...
     if not TimerManager.exists('image_processing'):
         TimerManager.add('image_processing', wait_for_image_processing, first_interval=0.1)
 
 
-
 def register():
     from ..utils import TimerManager
     
@@ -203,3 +500,15 @@ def register():
                            lambda: print(f"Error al cargar la imagen."))
         return None
     TimerManager.add('test_image_url', test_image_url, first_interval=5)
+
+
+def unregister():
+    # Vacía la cola para que los workers terminen por su cuenta (son daemon threads).
+    with _queue_condition:
+        process_queue.clear()
+        _queued_requests.clear()
+        _queue_condition.notify_all()
+    processed_queue.clear()
+    processing_images_ids.clear()
+    _active_requests.clear()
+    _image_names_by_url.clear()
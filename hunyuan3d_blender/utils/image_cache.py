@@ -0,0 +1,215 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import BinaryIO, Callable
+
+import numpy as np
+
+
+DEFAULT_MAX_SIZE_MB = 256
+CACHE_EXTENSION = ".npy"
+# Original bytes as served (png, jpg, gif...), stored when an image is saved so saving it again does not download it.
+# They live in their own directory and budget: multi-MB originals would otherwise evict the thumbnails.
+ORIGINAL_EXTENSION = ".orig"
+ORIGINALS_DIRNAME = "originals"
+ORIGINALS_MAX_SIZE_MB = 512
+
+
+class _DiskLRU:
+    """A directory of cache files bounded in size, least recently used evicted first."""
+
+    def __init__(self, label: str, extension: str):
+        self.label = label
+        self.extension = extension
+        self.lock = threading.Lock()
+        self.dirpath: Path | None = None
+        self.max_bytes = DEFAULT_MAX_SIZE_MB * 1024 * 1024
+        # Entry filename -> file size in bytes, least recently used first.
+        self.index: OrderedDict[str, int] = OrderedDict()
+        self.total_bytes = 0
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+        }
+
+    def entry_path(self, filename: str) -> Path:
+        return self.dirpath / filename
+
+    def configure(self, dirpath: Path, max_size_mb: int) -> None:
+        """Sets the location and size cap. The index is rebuilt from disk the first time."""
+        with self.lock:
+            self.max_bytes = max(0, int(max_size_mb)) * 1024 * 1024
+            if self.dirpath != dirpath:
+                dirpath.mkdir(parents=True, exist_ok=True)
+                self.dirpath = dirpath
+                self.index.clear()
+                self.total_bytes = 0
+                entries = []
+                for entry in os.scandir(dirpath):
+                    if entry.is_file() and entry.name.endswith(self.extension):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, entry.name, stat.st_size))
+                # Access time is tracked through mtime, oldest first.
+                for _mtime, filename, size in sorted(entries):
+                    self.index[filename] = size
+                    self.total_bytes += size
+            self._evict()
+
+    def _evict(self) -> None:
+        """Call with `lock` held."""
+        while self.total_bytes > self.max_bytes and self.index:
+            filename, size = self.index.popitem(last=False)
+            self.total_bytes -= size
+            self.stats["evictions"] += 1
+            try:
+                os.remove(self.entry_path(filename))
+            except OSError:
+                pass
+
+    def touch(self, filename: str) -> Path | None:
+        """Marks the entry as recently used and returns its path, or None on a miss."""
+        with self.lock:
+            if filename not in self.index:
+                self.stats["misses"] += 1
+                return None
+            self.index.move_to_end(filename)
+        return self.entry_path(filename)
+
+    def count(self, stat: str) -> None:
+        with self.lock:
+            self.stats[stat] += 1
+
+    def write_entry(self, name: str, filename: str, write: Callable[[BinaryIO], None]) -> None:
+        path = self.entry_path(filename)
+        tmp_path = path.with_name(f"{filename}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                write(f)
+            os.replace(tmp_path, path)
+            size = path.stat().st_size
+        except OSError as e:
+            print(f"{self.label}: could not write entry for {name}: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+        with self.lock:
+            self.total_bytes += size - self.index.get(filename, 0)
+            self.index[filename] = size
+            self.index.move_to_end(filename)
+            self._evict()
+
+    def discard(self, filename: str) -> None:
+        with self.lock:
+            self.total_bytes -= self.index.pop(filename, 0)
+        try:
+            os.remove(self.entry_path(filename))
+        except OSError:
+            pass
+
+    def clear(self) -> None:
+        with self.lock:
+            filenames = list(self.index.keys())
+        for filename in filenames:
+            self.discard(filename)
+
+    def get_stats(self) -> dict[str, int]:
+        with self.lock:
+            return {
+                **self.stats,
+                "entries": len(self.index),
+                "size_bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+_thumbnails = _DiskLRU("Thumbnail cache", CACHE_EXTENSION)
+_originals = _DiskLRU("Original image cache", ORIGINAL_EXTENSION)
+
+
+def cache_key(name: str) -> str:
+    return hashlib.sha1(name.encode("utf-8")).hexdigest()
+
+
+def _entry_filename(name: str, extension: str) -> str:
+    return f"{cache_key(name)}{extension}"
+
+
+def configure(dirpath: Path, max_size_mb: int) -> None:
+    """
+    Sets the thumbnail cache location and size cap. Originals are kept in a subdirectory with
+    their own cap. The indexes are rebuilt from disk the first time.
+    """
+    _thumbnails.configure(dirpath, max_size_mb)
+    _originals.configure(dirpath / ORIGINALS_DIRNAME, ORIGINALS_MAX_SIZE_MB)
+
+
+def is_configured() -> bool:
+    return _thumbnails.dirpath is not None
+
+
+def get(name: str) -> np.ndarray | None:
+    """Returns the cached (height, width, 4) uint8 RGBA payload for `name` (usually the url), or None on a miss."""
+    if _thumbnails.dirpath is None:
+        return None
+    filename = _entry_filename(name, CACHE_EXTENSION)
+    path = _thumbnails.touch(filename)
+    if path is None:
+        return None
+    try:
+        pixels = np.load(path, allow_pickle=False)
+        os.utime(path)
+    except (OSError, ValueError) as e:
+        print(f"Thumbnail cache: dropping unreadable entry for {name}: {e}")
+        _thumbnails.discard(filename)
+        _thumbnails.count("misses")
+        return None
+    _thumbnails.count("hits")
+    return pixels
+
+
+def get_original_path(url: str) -> Path | None:
+    """Returns the path of the original bytes downloaded from `url`, or None on a miss. The file must not be modified."""
+    if _originals.dirpath is None:
+        return None
+    filename = _entry_filename(url, ORIGINAL_EXTENSION)
+    path = _originals.touch(filename)
+    if path is None:
+        return None
+    try:
+        os.utime(path)
+    except OSError:
+        _originals.discard(filename)
+        _originals.count("misses")
+        return None
+    _originals.count("hits")
+    return path
+
+
+def put(name: str, pixels: np.ndarray) -> None:
+    """Stores a (height, width, 4) uint8 RGBA payload for `name`."""
+    if _thumbnails.dirpath is None:
+        return
+    _thumbnails.write_entry(name, _entry_filename(name, CACHE_EXTENSION),
+                            lambda f: np.save(f, pixels.astype(np.uint8, copy=False), allow_pickle=False))
+
+
+def put_original(url: str, data: bytes) -> None:
+    """Stores the original bytes downloaded from `url`."""
+    if _originals.dirpath is None:
+        return
+    _originals.write_entry(url, _entry_filename(url, ORIGINAL_EXTENSION), lambda f: f.write(data))
+
+
+def clear() -> None:
+    _thumbnails.clear()
+    _originals.clear()
+
+
+def get_stats() -> dict[str, int]:
+    """Stats of the thumbnail cache (originals have their own budget and are not counted)."""
+    return _thumbnails.get_stats()
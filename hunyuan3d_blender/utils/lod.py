@@ -0,0 +1,159 @@
+"""
+Decimated viewport proxies (LODs) for heavy imported models.
+
+Decimation is vertex clustering on a uniform grid, fully vectorized with numpy: vertices are
+snapped to cells, each cell becomes one vertex (the mean of its members) and the triangles
+that collapse are dropped. Quality is below an edge-collapse decimator but it runs in a
+fraction of a second on million-face meshes, which is what a viewport proxy needs.
+"""
+import bpy
+
+import numpy as np
+
+
+LOD_RATIOS = (0.1, 0.01)
+MIN_LOD_FACES = 64
+# Custom properties of a proxy object.
+LOD_LEVEL_PROP = "h3d_lod_level"  # level shown: 0 is the full mesh, 1.. the decimated ones
+LOD_FULL_PROP = "h3d_lod_full"
+LOD_MESH_PROP_PREFIX = "h3d_lod_mesh_"
+
+
+def cluster_decimate(coords: np.ndarray, triangles: np.ndarray, target_faces: int,
+                     uvs: np.ndarray | None = None) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray | None]:
+    """
+    Simplifies a triangle mesh to roughly `target_faces` faces.
+    Returns (coords, triangles, kept_triangle_indices, uvs) where `kept_triangle_indices`
+    maps every output triangle to its source triangle (to carry per-face data over).
+    """
+    tri_coords = coords[triangles]
+    areas = 0.5 * np.linalg.norm(np.cross(tri_coords[:, 1] - tri_coords[:, 0], tri_coords[:, 2] - tri_coords[:, 0]), axis=1)
+    # A closed surface with V vertices has about 2V triangles: size the cells so ~target/2 of them are occupied.
+    cell_size = np.sqrt(max(float(areas.sum()), 1e-12) / max(target_faces / 2, 1))
+
+    cells = np.floor((coords - coords.min(axis=0)) / cell_size).astype(np.int64)
+    dims = cells.max(axis=0) + 1
+    keys = (cells[:, 0] * dims[1] + cells[:, 1]) * dims[2] + cells[:, 2]
+    _unique_keys, cluster_of_vertex = np.unique(keys, return_inverse=True)
+    cluster_count = int(cluster_of_vertex.max()) + 1 if len(cluster_of_vertex) else 0
+
+    counts = np.bincount(cluster_of_vertex, minlength=cluster_count).astype(np.float32)
+    new_coords = np.empty((cluster_count, 3), dtype=np.float32)
+    for axis in range(3):
+        new_coords[:, axis] = np.bincount(cluster_of_vertex, weights=coords[:, axis], minlength=cluster_count) / counts
+    new_uvs = None
+    if uvs is not None:
+        # Seams get averaged: fine for a proxy, which is only meant to be a stand-in.
+        new_uvs = np.empty((cluster_count, 2), dtype=np.float32)
+        for axis in range(2):
+            new_uvs[:, axis] = np.bincount(cluster_of_vertex, weights=uvs[:, axis], minlength=cluster_count) / counts
+
+    new_triangles = cluster_of_vertex[triangles]
+    a, b, c = new_triangles[:, 0], new_triangles[:, 1], new_triangles[:, 2]
+    kept = np.flatnonzero((a != b) & (b != c) & (a != c))
+    # Several source triangles can collapse onto the same cluster triangle: keep one.
+    _unique_faces, first = np.unique(np.sort(new_triangles[kept], axis=1), axis=0, return_index=True)
+    kept = kept[np.sort(first)]
+    return new_coords, new_triangles[kept].astype(np.int32), kept, new_uvs
+
+
+def _mesh_arrays(mesh: bpy.types.Mesh) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray | None]:
+    """(coords, triangles, triangle material indices, per-vertex uvs or None) of a mesh."""
+    coords = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", coords)
+    mesh.calc_loop_triangles()
+    triangles = np.empty(len(mesh.loop_triangles) * 3, dtype=np.int32)
+    mesh.loop_triangles.foreach_get("vertices", triangles)
+    material_indices = np.empty(len(mesh.loop_triangles), dtype=np.int32)
+    mesh.loop_triangles.foreach_get("material_index", material_indices)
+    uvs = None
+    if mesh.uv_layers.active is not None:
+        loop_uvs = np.empty(len(mesh.loops) * 2, dtype=np.float32)
+        mesh.uv_layers.active.uv.foreach_get("vector", loop_uvs)
+        loop_vertices = np.empty(len(mesh.loops), dtype=np.int32)
+        mesh.loops.foreach_get("vertex_index", loop_vertices)
+        uvs = np.zeros((len(mesh.vertices), 2), dtype=np.float32)
+        uvs[loop_vertices] = loop_uvs.reshape(-1, 2)
+    return coords.reshape(-1, 3), triangles.reshape(-1, 3), material_indices, uvs
+
+
+def _mesh_from_arrays(name: str, coords: np.ndarray, triangles: np.ndarray, material_indices: np.ndarray,
+                      uvs: np.ndarray | None, materials) -> bpy.types.Mesh:
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(len(coords))
+    mesh.vertices.foreach_set("co", coords.ravel())
+    corner_verts = triangles.ravel()
+    mesh.loops.add(len(corner_verts))
+    mesh.loops.foreach_set("vertex_index", corner_verts)
+    mesh.polygons.add(len(triangles))
+    mesh.polygons.foreach_set("loop_start", np.arange(0, len(corner_verts), 3, dtype=np.int32))
+    for material in materials:
+        mesh.materials.append(material)
+    mesh.polygons.foreach_set("material_index", material_indices)
+    mesh.update(calc_edges=True)
+    if uvs is not None:
+        uv_layer = mesh.uv_layers.new(name="UVMap")
+        uv_layer.uv.foreach_set("vector", uvs[corner_verts].ravel())
+    mesh.shade_smooth()
+    return mesh
+
+
+def create_lod_proxy(obj: bpy.types.Object, ratios: tuple[float, ...] = LOD_RATIOS) -> bpy.types.Object | None:
+    """
+    Builds decimated meshes of `obj`, one per ratio of its face count, and a proxy object that
+    displays them. The proxy takes the place of `obj` in the hierarchy and becomes its parent,
+    so selecting and moving the proxy moves the model. The proxy is hidden from renders, and
+    `obj` (the full mesh) is disabled in the viewport but still renders.
+    """
+    if obj.type != 'MESH' or len(obj.data.polygons) == 0:
+        return None
+    coords, triangles, material_indices, uvs = _mesh_arrays(obj.data)
+    materials = list(obj.data.materials)
+
+    lod_meshes = []
+    for level, ratio in enumerate(ratios, start=1):
+        target_faces = int(len(triangles) * ratio)
+        if target_faces < MIN_LOD_FACES:
+            break
+        lod_coords, lod_triangles, kept, lod_uvs = cluster_decimate(coords, triangles, target_faces, uvs)
+        lod_meshes.append(_mesh_from_arrays(f"{obj.data.name}_LOD{level}", lod_coords, lod_triangles,
+                                            material_indices[kept], lod_uvs, materials))
+    if not lod_meshes:
+        return None
+
+    proxy = bpy.data.objects.new(f"{obj.name}_LOD", lod_meshes[0])
+    for collection in obj.users_collection:
+        collection.objects.link(proxy)
+    proxy.parent = obj.parent
+    proxy.matrix_parent_inverse = obj.matrix_parent_inverse.copy()
+    proxy.matrix_basis = obj.matrix_basis.copy()
+    obj.parent = proxy
+    obj.matrix_parent_inverse.identity()
+    obj.matrix_basis.identity()
+
+    proxy.hide_render = True
+    obj.hide_viewport = True
+    # ID pointers in custom properties keep the LOD meshes alive (and saved) while they are not displayed.
+    proxy[LOD_FULL_PROP] = obj
+    for level, mesh in enumerate(lod_meshes, start=1):
+        proxy[f"{LOD_MESH_PROP_PREFIX}{level}"] = mesh
+    proxy[LOD_LEVEL_PROP] = 1
+    return proxy
+
+
+def get_lod_count(proxy: bpy.types.Object) -> int:
+    """Number of decimated levels of a proxy (level 0, the full mesh, not included)."""
+    count = 0
+    while f"{LOD_MESH_PROP_PREFIX}{count + 1}" in proxy:
+        count += 1
+    return count
+
+
+def set_lod_level(proxy: bpy.types.Object, level: int) -> None:
+    """Shows one level on the proxy: 0 is the full mesh, 1.. the decimated ones. Renders always use the full mesh."""
+    full = proxy.get(LOD_FULL_PROP)
+    mesh = full.data if level == 0 and full is not None else proxy.get(f"{LOD_MESH_PROP_PREFIX}{level}")
+    if mesh is None:
+        return
+    proxy.data = mesh
+    proxy[LOD_LEVEL_PROP] = level
@@ -0,0 +1,267 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+
+DEFAULT_MAX_SIZE_MB = 2048
+MANIFEST_FILENAME = "manifest.json"
+MANIFEST_VERSION = 1
+BLOBS_DIRNAME = "blobs"
+INCOMING_DIRNAME = "incoming"
+MODEL_EXTENSION = ".glb"
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Protects the in-memory manifest only: file copies, hashing and manifest writes happen outside
+# of it, since the main thread takes it (stats in the preferences, cache lookups on import).
+_lock = threading.RLock()
+# Serializes manifest writes, so an older snapshot never overwrites a newer one.
+_manifest_lock = threading.Lock()
+_manifest_serial = 0
+_manifest_written_serial = 0
+_dirpath: Path | None = None
+_max_bytes = DEFAULT_MAX_SIZE_MB * 1024 * 1024
+# Cache key -> {"asset_id", "url", "sha256", "size", "mtime", "last_access"}.
+# Several keys may point to the same blob (identical content), a blob is only counted once.
+_entries: dict[str, dict] = {}
+_stats = {
+    "hits": 0,
+    "misses": 0,
+    "evictions": 0,
+}
+
+
+def cache_key(asset_id: str, url: str) -> str:
+    # Signed download urls carry expiring query strings, only the path identifies the file.
+    parts = urlsplit(url)
+    return hashlib.sha1(f"{asset_id}|{parts.netloc}{parts.path}".encode("utf-8")).hexdigest()
+
+
+def _blob_path(sha256: str) -> Path:
+    return _dirpath / BLOBS_DIRNAME / f"{sha256}{MODEL_EXTENSION}"
+
+
+def _manifest_path() -> Path:
+    return _dirpath / MANIFEST_FILENAME
+
+
+def file_sha256(filepath: str | Path) -> str:
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def link_or_copy(src: str | Path, dst: str | Path) -> None:
+    """Hardlinks `src` to `dst` (copies when linking is not possible, e.g. across drives), replacing `dst`."""
+    src, dst = Path(src), Path(dst)
+    if dst.exists() and os.path.samefile(src, dst):
+        return
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = dst.with_name(f"{dst.name}.{threading.get_ident()}.tmp")
+    try:
+        try:
+            os.link(src, tmp_path)
+        except OSError:
+            shutil.copyfile(src, tmp_path)
+        os.replace(tmp_path, dst)
+    finally:
+        if tmp_path.exists():
+            os.remove(tmp_path)
+
+
+def _load_manifest() -> None:
+    _entries.clear()
+    try:
+        with open(_manifest_path(), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return
+    except (OSError, ValueError) as e:
+        print(f"Model cache: ignoring unreadable manifest: {e}")
+        return
+    if data.get("version") != MANIFEST_VERSION:
+        return
+    for key, entry in data.get("entries", {}).items():
+        if _blob_path(entry["sha256"]).is_file():
+            _entries[key] = entry
+
+
+def _save_manifest() -> None:
+    """Writes a snapshot of the entries. Only the snapshot is taken under `_lock`."""
+    global _manifest_serial, _manifest_written_serial
+    with _lock:
+        _manifest_serial += 1
+        serial = _manifest_serial
+        data = json.dumps({"version": MANIFEST_VERSION, "entries": _entries})
+        path = _manifest_path()
+    with _manifest_lock:
+        if serial < _manifest_written_serial:
+            return
+        tmp_path = path.with_name(f"{MANIFEST_FILENAME}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            _manifest_written_serial = serial
+        except OSError as e:
+            print(f"Model cache: could not write manifest: {e}")
+
+
+def _total_bytes() -> int:
+    return sum({entry["sha256"]: entry["size"] for entry in _entries.values()}.values())
+
+
+def _remove_entry(key: str) -> None:
+    entry = _entries.pop(key)
+    if not any(other["sha256"] == entry["sha256"] for other in _entries.values()):
+        try:
+            os.remove(_blob_path(entry["sha256"]))
+        except OSError:
+            pass
+
+
+def _evict(keep: str | None = None) -> None:
+    """Drops least recently used entries until the cache fits. `keep` is never evicted."""
+    total = _total_bytes()
+    for key in sorted(_entries, key=lambda k: _entries[k]["last_access"]):
+        if total <= _max_bytes:
+            break
+        if key == keep:
+            continue
+        _remove_entry(key)
+        _stats["evictions"] += 1
+        total = _total_bytes()
+
+
+def configure(dirpath: Path, max_size_mb: int) -> None:
+    """Sets the cache location and size cap. The manifest is loaded the first time."""
+    global _dirpath, _max_bytes
+    with _lock:
+        _max_bytes = max(0, int(max_size_mb)) * 1024 * 1024
+        if _dirpath != dirpath:
+            _dirpath = dirpath
+            (dirpath / BLOBS_DIRNAME).mkdir(parents=True, exist_ok=True)
+            (dirpath / INCOMING_DIRNAME).mkdir(parents=True, exist_ok=True)
+            _load_manifest()
+        entry_count = len(_entries)
+        _evict()
+        if len(_entries) != entry_count:
+            _save_manifest()
+
+
+def is_configured() -> bool:
+    return _dirpath is not None
+
+
+def get_incoming_path(asset_id: str, url: str) -> Path:
+    """Stable download destination for a model that is not saved anywhere yet, so interrupted downloads can resume."""
+    return _dirpath / INCOMING_DIRNAME / f"{cache_key(asset_id, url)}{MODEL_EXTENSION}"
+
+
+def contains(asset_id: str, url: str) -> bool:
+    """Cheap membership test: no file checks, no stats or recency update."""
+    with _lock:
+        return cache_key(asset_id, url) in _entries
+
+
+def get(asset_id: str, url: str) -> Path | None:
+    """Returns the path of the cached GLB for this asset, or None on a miss. The file must not be modified."""
+    if _dirpath is None:
+        return None
+    key = cache_key(asset_id, url)
+    with _lock:
+        entry = _entries.get(key)
+        if entry is None:
+            _stats["misses"] += 1
+            return None
+        sha256, size, mtime = entry["sha256"], entry["size"], entry["mtime"]
+        path = _blob_path(sha256)
+    try:
+        stat = path.stat()
+        valid = stat.st_size == size
+        if valid and stat.st_mtime != mtime:
+            # Touched since it was cached (a hardlinked copy may have been edited): verify the content.
+            valid = file_sha256(path) == sha256
+    except OSError:
+        valid = False
+    with _lock:
+        entry = _entries.get(key)
+        if entry is None or entry["sha256"] != sha256:
+            # Evicted or replaced while checking.
+            _stats["misses"] += 1
+            return None
+        if valid:
+            entry["mtime"] = stat.st_mtime
+            entry["last_access"] = time.time()
+            _stats["hits"] += 1
+        else:
+            print(f"Model cache: dropping corrupted entry for asset {asset_id}")
+            _remove_entry(key)
+            _stats["misses"] += 1
+    _save_manifest()
+    return path if valid else None
+
+
+def put(asset_id: str, url: str, filepath: str | Path, move: bool = False) -> Path | None:
+    """
+    Adds a downloaded GLB to the cache and returns its cached path.
+    With `move` the file is taken over (e.g. from `get_incoming_path`), otherwise it is hardlinked or copied.
+    """
+    if _dirpath is None:
+        return None
+    key = cache_key(asset_id, url)
+    try:
+        # Hashed and copied without the lock: blobs are named by content and written atomically,
+        # so concurrent puts of the same model write the same file.
+        sha256 = file_sha256(filepath)
+        blob_path = _blob_path(sha256)
+        if not blob_path.is_file():
+            if move:
+                os.replace(filepath, blob_path)
+            else:
+                link_or_copy(filepath, blob_path)
+        elif move:
+            os.remove(filepath)
+        with _lock:
+            # The stat is under the lock, so an eviction of the same blob cannot slip in before the entry.
+            stat = blob_path.stat()
+            _entries[key] = {
+                "asset_id": asset_id,
+                "url": url,
+                "sha256": sha256,
+                "size": stat.st_size,
+                "mtime": stat.st_mtime,
+                "last_access": time.time(),
+            }
+            _evict(keep=key)
+        _save_manifest()
+    except OSError as e:
+        print(f"Model cache: could not store asset {asset_id}: {e}")
+        return None
+    return blob_path
+
+
+def clear() -> None:
+    with _lock:
+        for key in list(_entries):
+            _remove_entry(key)
+        if _dirpath is not None:
+            _save_manifest()
+
+
+def get_stats() -> dict[str, int]:
+    with _lock:
+        return {
+            "hits": _stats["hits"],
+            "misses": _stats["misses"],
+            "evictions": _stats["evictions"],
+            "entries": len(_entries),
+            "size_bytes": _total_bytes(),
+            "max_bytes": _max_bytes,
+        }
@@ -0,0 +1,108 @@
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, TypeVar
+from urllib.parse import urlparse
+
+import requests
+
+
+T = TypeVar("T")
+
+DEFAULT_CONNECTIONS_PER_HOST = 4
+RETRYABLE_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+
+_host_limit = DEFAULT_CONNECTIONS_PER_HOST
+# Model downloads hold a connection for a whole transfer: they get their own slots, so a bulk
+# save never starves preview fetches to the same host (and the other way around).
+POOL_PREVIEWS = "previews"
+POOL_DOWNLOADS = "downloads"
+# (pool, host) -> slots.
+_host_slots: dict[tuple[str, str], threading.BoundedSemaphore] = {}
+_host_slots_lock = threading.Lock()
+
+# Bandwidth shared by all background transfers (prefetches), in bytes per second. 0: unlimited.
+_background_rate = 0
+_background_next_time = 0.0
+_background_lock = threading.Lock()
+
+
+def get_host(url: str) -> str:
+    return urlparse(url).netloc.lower()
+
+
+def set_connections_per_host(limit: int) -> None:
+    """Changes the per-host connection limit of each pool. Connections already holding a slot keep it."""
+    global _host_limit
+    limit = max(1, int(limit))
+    with _host_slots_lock:
+        if limit == _host_limit:
+            return
+        _host_limit = limit
+        _host_slots.clear()
+
+
+@contextmanager
+def host_slot(url: str, pool: str = POOL_PREVIEWS):
+    """Blocks until a connection slot of `pool` for the url's host is available."""
+    key = (pool, get_host(url))
+    with _host_slots_lock:
+        slot = _host_slots.get(key)
+        if slot is None:
+            slot = _host_slots[key] = threading.BoundedSemaphore(_host_limit)
+    with slot:
+        yield
+
+
+def set_background_bandwidth(bytes_per_second: int) -> None:
+    global _background_rate
+    with _background_lock:
+        _background_rate = max(0, int(bytes_per_second))
+
+
+def throttle_background(byte_count: int) -> None:
+    """Call after receiving `byte_count` bytes of a background transfer: sleeps as needed so
+    that all background transfers together stay within the background bandwidth."""
+    global _background_next_time
+    with _background_lock:
+        if _background_rate <= 0:
+            return
+        now = time.monotonic()
+        # No credit is kept from idle periods, so a new transfer cannot burst.
+        _background_next_time = max(_background_next_time, now) + byte_count / _background_rate
+        delay = _background_next_time - now
+    time.sleep(delay)
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout, TimeoutError)):
+        return True
+    if isinstance(error, requests.exceptions.HTTPError):
+        response = getattr(error, "response", None)
+        return response is not None and response.status_code in RETRYABLE_STATUS_CODES
+    return False
+
+
+def retry_with_backoff(func: Callable[[], T],
+                       retries: int = 3,
+                       base_delay: float = 0.5,
+                       max_delay: float = 8.0,
+                       on_retry: Callable[[BaseException, int, float], None] | None = None) -> T:
+    """Calls `func`, retrying transient network errors with jittered exponential backoff.
+
+    Non retryable errors (and the last retryable one) are re-raised to the caller.
+    """
+    attempt = 0
+    while True:
+        try:
+            return func()
+        except Exception as e:
+            if attempt >= retries or not is_retryable_error(e):
+                raise
+            delay = min(max_delay, base_delay * (2 ** attempt))
+            delay *= 0.5 + random.random() * 0.5
+            attempt += 1
+            if on_retry is not None:
+                on_retry(e, attempt, delay)
+            time.sleep(delay)
@@ -0,0 +1,20 @@
+import bpy
+
+from pathlib import Path
+
+
+# Root package of the addon, e.g. 'bl_ext.user_default.hunyuan3d_bridge'.
+addon_package = __package__.rpartition('.')[0]
+package_name_sort = addon_package.split('.')[-1]
+
+
+def get_user_dirpath(subdir: str) -> Path:
+    """Returns (and creates) a persistent per-user directory for the addon's local data.
+
+    Must be called from the main thread. The returned path is safe to use from any thread.
+    """
+    try:
+        return Path(bpy.utils.extension_path_user(addon_package, path=subdir, create=True))
+    except ValueError:
+        # Installed as a legacy add-on, not as an extension.
+        return Path(bpy.utils.user_resource('DATAFILES', path=f"{package_name_sort}/{subdir}", create=True))
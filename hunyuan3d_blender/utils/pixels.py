@@ -0,0 +1,187 @@
+"""
+Etapas de píxeles del pipeline de previews (decodificar, recortar, convertir a float).
+Solo depende de numpy e imageio, sin `bpy`, para poder usarse desde los workers y los benchmarks.
+"""
+import io
+from typing import Iterator
+
+import imageio.v3 as iio  # Use modern imageio.v3 API
+import numpy as np
+from PIL import Image
+
+
+GIF_SIGNATURES = (b"GIF87a", b"GIF89a")
+
+
+def is_gif(img_bytes: bytes) -> bool:
+    return img_bytes[:6] in GIF_SIGNATURES
+
+
+def iter_gif_frames(img_bytes: bytes, frame_step: int = 1, max_frames: int = 1) -> Iterator[np.ndarray]:
+    """
+    Lee un GIF animado en streaming y devuelve cada `frame_step` frames como RGBA uint8,
+    parando en cuanto se tienen `max_frames`. Los frames saltados solo se componen (los GIF
+    son deltas), sin convertirlos ni guardarlos, y los que quedan tras el último nunca se decodifican.
+    """
+    frame_step = max(1, frame_step)
+    with Image.open(io.BytesIO(img_bytes)) as gif:
+        frame_count = getattr(gif, "n_frames", 1)
+        for frame_index in range(0, min(frame_count, frame_step * max_frames), frame_step):
+            gif.seek(frame_index)
+            yield np.asarray(gif.convert("RGBA"))
+
+
+def decode_gif_bytes(img_bytes: bytes, frames: int = 1, frame_step: int = 1) -> np.ndarray:
+    """
+    Decodifica el primer frame de un GIF (`frames=1`) o una tira horizontal (sprite sheet)
+    con `frames` frames, uno cada `frame_step`, para previews tipo flipbook.
+    """
+    frame_iter = iter_gif_frames(img_bytes, frame_step, frames)
+    first = next(frame_iter)
+    if frames <= 1:
+        return first
+    height, width = first.shape[0], first.shape[1]
+    sheet = np.zeros((height, width * frames, 4), dtype=np.uint8)
+    sheet[:, :width] = first
+    used = 1
+    for frame in frame_iter:
+        sheet[:, used * width:(used + 1) * width] = frame
+        used += 1
+    # Si el GIF tenía menos frames de los pedidos, la tira se acorta.
+    return sheet[:, :used * width]
+
+
+def decode_image_bytes(id: str, img_bytes: bytes, gif_frames: int = 1, gif_frame_step: int = 1) -> np.ndarray | None:
+    """
+    Decodifica los bytes de una imagen a un array RGBA uint8 de forma (alto, ancho, 4).
+    Los GIF animados se leen en streaming: solo el primer frame, o una tira de `gif_frames`.
+    Devuelve None si el formato no está soportado.
+    """
+    if is_gif(img_bytes):
+        return decode_gif_bytes(img_bytes, gif_frames, gif_frame_step)
+
+    img_array_raw = iio.imread(img_bytes, index=0, pilmode="RGBA") # Request RGBA to simplify channel handling
+
+    # Nos quedamos en uint8: 4 veces menos memoria que float32 hasta el último paso.
+    if img_array_raw.dtype == np.uint8:
+        img_array = img_array_raw
+    elif img_array_raw.dtype == np.uint16:
+        img_array = (img_array_raw >> 8).astype(np.uint8)
+    elif img_array_raw.dtype in (np.float32, np.float64):
+        img_array = np.rint(np.clip(img_array_raw, 0.0, 1.0) * 255.0).astype(np.uint8)
+    else:
+        print(f"Error: Tipo de dato no soportado por imageio: {img_array_raw.dtype} para la imagen '{id}'. Intentando convertir.")
+        img_array = iio.imread(img_bytes, mode='RGBA', pilmode="RGBA").astype(np.uint8)
+
+    # Ensure we have 4 channels (RGBA)
+    if img_array.ndim == 3 and img_array.shape[2] == 4: # RGBA
+        return img_array
+    elif img_array.ndim == 3 and img_array.shape[2] == 3: # RGB
+        print(f"  Imagen '{id}' es RGB, añadiendo canal alfa.")
+        return _with_opaque_alpha(img_array)
+    elif img_array.ndim == 2: # Grayscale
+        print(f"  Imagen '{id}' es escala de grises, convirtiendo a RGBA.")
+        return _with_opaque_alpha(img_array[..., np.newaxis])
+
+    print(f"Error: Número de canales no soportado ({img_array.shape}) para la imagen '{id}' tras conversión.")
+    return None
+
+
+def _with_opaque_alpha(img_array: np.ndarray) -> np.ndarray:
+    rgba = np.empty((img_array.shape[0], img_array.shape[1], 4), dtype=np.uint8)
+    rgba[..., :3] = img_array  # broadcasts the grayscale channel
+    rgba[..., 3] = 255
+    return rgba
+
+
+def find_content_bbox(img: np.ndarray, margin: int = 5) -> tuple[int, int, int, int]:
+    """
+    Calcula la caja (y_min, y_max, x_min, x_max), inclusiva, del contenido que no es
+    completamente blanco ni transparente, con un margen alrededor.
+    Funciona sobre uint8 (blanco = 255) o float (blanco = 1.0).
+    """
+    assert img.ndim == 3 and img.shape[2] == 4, "Se espera una imagen RGBA."
+    height, width = img.shape[0], img.shape[1]
+
+    if img.dtype == np.uint8 and img.flags.c_contiguous:
+        # Cada píxel RGBA como un único uint32: una sola comparación por píxel.
+        packed = img.view(np.uint32)[..., 0]
+        if np.little_endian:
+            rgb_mask, alpha_mask = np.uint32(0x00FFFFFF), np.uint32(0xFF000000)
+        else:
+            rgb_mask, alpha_mask = np.uint32(0xFFFFFF00), np.uint32(0x000000FF)
+        mask = ((packed & rgb_mask) != rgb_mask) & ((packed & alpha_mask) != 0)
+    else:
+        white = 255 if img.dtype == np.uint8 else 1.0
+        r, g, b, a = img[..., 0], img[..., 1], img[..., 2], img[..., 3]
+        # Crear una máscara donde los píxeles NO son blancos ni transparentes
+        mask = ~((r == white) & (g == white) & (b == white) | (a == 0))
+
+    # Combinar por filas y columnas
+    rows = np.flatnonzero(mask.any(axis=1))
+    cols = np.flatnonzero(mask.any(axis=0))
+    if rows.size == 0 or cols.size == 0:
+        # Imagen vacía: no hay nada que recortar.
+        return 0, height - 1, 0, width - 1
+
+    # Aplicar margen
+    y_min = max(0, int(rows[0]) - margin)
+    y_max = min(height - 1, int(rows[-1]) + margin)
+    x_min = max(0, int(cols[0]) - margin)
+    x_max = min(width - 1, int(cols[-1]) + margin)
+    return y_min, y_max, x_min, x_max
+
+
+def crop_transparent_or_white_edges(img: np.ndarray, margin: int = 5) -> np.ndarray:
+    """
+    Recorta las filas y columnas que son completamente blancas o transparentes.
+    Deja un margen configurable alrededor del contenido útil.
+    Devuelve una vista, sin copiar los píxeles.
+    """
+    y_min, y_max, x_min, x_max = find_content_bbox(img, margin)
+    return img[y_min:y_max+1, x_min:x_max+1]
+
+
+def to_blender_pixels(img_flipped: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+    """
+    Convierte un RGBA uint8 (ya volteado, filas de abajo a arriba) en el buffer float32 plano
+    que espera `Image.pixels.foreach_set`. La conversión se hace en una sola pasada sobre
+    un buffer preasignado (`out`, opcional), sin copias intermedias.
+    """
+    height, width = img_flipped.shape[0], img_flipped.shape[1]
+    if out is None:
+        out = np.empty(height * width * 4, dtype=np.float32)
+    np.multiply(img_flipped, np.float32(1.0 / 255.0), out=out.reshape(height, width, 4))
+    return out
+
+
+def downscale_box(img: np.ndarray, max_size: int) -> np.ndarray:
+    """
+    Reduce una imagen RGBA uint8 con un filtro de caja (media por área) de factor entero,
+    vectorizado con un reshape, para que su lado mayor no supere `max_size`.
+    Si ya cabe, devuelve la misma imagen sin copiar.
+    """
+    height, width = img.shape[0], img.shape[1]
+    if max_size <= 0 or max(height, width) <= max_size:
+        return img
+    factor = -(-max(height, width) // max_size)  # ceil
+    # En imágenes muy alargadas el lado corto puede ser menor que el factor.
+    factor_y, factor_x = min(factor, height), min(factor, width)
+    out_h, out_w = height // factor_y, width // factor_x
+    # Los píxeles sobrantes del borde (menos de `factor`) se descartan.
+    blocks = img[:out_h * factor_y, :out_w * factor_x].reshape(out_h, factor_y, out_w, factor_x, 4)
+    averaged = blocks.mean(axis=(1, 3), dtype=np.float32)
+    return np.rint(averaged, out=averaged).astype(np.uint8)
+
+
+def prepare_preview_pixels(img_array_rgba: np.ndarray, max_size: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Recorta los bordes sobre el uint8 original, lo reduce a `max_size` (0 = sin límite)
+    y da la vuelta a la imagen para Blender.
+    Devuelve (rgba_uint8_volteado, pixels_float32_planos).
+    """
+    img_cropped = crop_transparent_or_white_edges(img_array_rgba, margin=5)
+    img_cropped = downscale_box(img_cropped, max_size)
+    # Blender expects pixels from bottom-left, imageio gives top-left rows: flip as a view.
+    img_flipped = img_cropped[::-1]
+    return img_flipped, to_blender_pixels(img_flipped)
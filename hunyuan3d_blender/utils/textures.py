@@ -0,0 +1,70 @@
+"""
+Resolution cap for the textures embedded in imported models.
+
+Decoding, resizing and re-encoding run in a thread pool (Pillow releases the GIL for that work);
+only creating and packing the Blender images happens on the main thread.
+"""
+import bpy
+
+import io
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+
+MAX_WORKERS = 8
+PIL_FORMAT_EXTENSIONS = {"PNG": ".png", "JPEG": ".jpg", "WEBP": ".webp"}
+
+
+def cap_image_bytes(data: bytes, max_size: int) -> tuple[bytes, str] | None:
+    """
+    Downscales an encoded image so its longest side is at most `max_size`, keeping its format.
+    Returns (new bytes, file extension), or None when it already fits (only the header is read then).
+    """
+    with Image.open(io.BytesIO(data)) as image:
+        if max_size <= 0 or max(image.size) <= max_size:
+            return None
+        image_format = image.format if image.format in PIL_FORMAT_EXTENSIONS else "PNG"
+        scale = max_size / max(image.size)
+        resized = image.resize((max(1, round(image.width * scale)), max(1, round(image.height * scale))), Image.Resampling.LANCZOS)
+    output = io.BytesIO()
+    if image_format == "JPEG":
+        resized.save(output, format="JPEG", quality=95)
+    elif image_format == "PNG":
+        # Fast compression: these files are packed into the .blend, not distributed.
+        resized.save(output, format="PNG", compress_level=1)
+    else:
+        resized.save(output, format=image_format)
+    return output.getvalue(), PIL_FORMAT_EXTENSIONS[image_format]
+
+
+def cap_images_parallel(blobs: list[bytes], max_size: int) -> list[tuple[bytes, str] | None]:
+    """Runs `cap_image_bytes` on every blob in a thread pool. Failures leave the original untouched (None)."""
+    def _cap(data: bytes):
+        try:
+            return cap_image_bytes(data, max_size)
+        except Exception as e:
+            print(f"Texture cap: could not process an image: {e}")
+            return None
+
+    if max_size <= 0 or not blobs:
+        return [None] * len(blobs)
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(blobs), os.cpu_count() or 1)) as executor:
+        return list(executor.map(_cap, blobs))
+
+
+def load_packed_image(name: str, data: bytes, extension: str) -> bpy.types.Image:
+    """Creates a packed Blender image from encoded bytes. Blender only loads images from files, so they go through a temp file."""
+    fd, tmp_path = tempfile.mkstemp(suffix=extension, dir=bpy.app.tempdir or None)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        image = bpy.data.images.load(tmp_path)
+        image.pack()
+    finally:
+        os.remove(tmp_path)
+    image.name = name
+    image.filepath_raw = ""
+    return image
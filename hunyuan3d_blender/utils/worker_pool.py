@@ -0,0 +1,97 @@
+import heapq
+import itertools
+import threading
+from typing import Callable, Generic, TypeVar
+
+
+J = TypeVar("J")
+
+
+class WorkerPool(Generic[J]):
+    """
+    Daemon threads serving a heap of (priority, arrival order, job). Jobs need a `seq` attribute:
+    pushing a job again (e.g. with a higher priority) makes its previous heap entry stale, and
+    stale entries are skipped when popping. Workers stop after `idle_timeout` seconds without
+    jobs, `ensure_workers` starts them again.
+
+    `condition` guards the heap and the worker list, and is shared with the owner so its own
+    bookkeeping can be updated atomically with them:
+    - `is_stale(job)`: whether a job still in the heap was cancelled or already handled.
+    - `can_start(job)`: whether the next job may start now, otherwise workers wait for another push.
+    - `on_start(job)`: bookkeeping once a worker took the job, called with `condition` held.
+    - `run_job(job)`: the work itself, called without the lock. Exceptions are printed, the worker goes on.
+    """
+
+    def __init__(self, condition: threading.Condition, run_job: Callable[[J], None], idle_timeout: float,
+                 is_stale: Callable[[J], bool] | None = None,
+                 can_start: Callable[[J], bool] | None = None,
+                 on_start: Callable[[J], None] | None = None,
+                 name: str = "worker"):
+        self.condition = condition
+        self.queue: list[tuple[int, int, J]] = []
+        self.workers: list[threading.Thread] = []
+        self.idle_timeout = idle_timeout
+        self._run_job = run_job
+        self._is_stale = is_stale
+        self._can_start = can_start
+        self._on_start = on_start
+        self._name = name
+        self._counter = itertools.count()
+
+    def push(self, job: J, priority: int) -> None:
+        """Call with `condition` held."""
+        job.seq = next(self._counter)
+        heapq.heappush(self.queue, (priority, job.seq, job))
+
+    def pop(self) -> J | None:
+        """Pops the live job with the highest priority, if it can start. Call with `condition` held."""
+        while self.queue:
+            _priority, seq, job = self.queue[0]
+            if seq != job.seq or (self._is_stale is not None and self._is_stale(job)):
+                heapq.heappop(self.queue)
+                continue
+            if self._can_start is not None and not self._can_start(job):
+                return None
+            heapq.heappop(self.queue)
+            return job
+        return None
+
+    def _take_job(self) -> J | None:
+        with self.condition:
+            job = self.pop()
+            if job is None:
+                # Wait a bit for new jobs before stopping the worker.
+                self.condition.wait(timeout=self.idle_timeout)
+                job = self.pop()
+                if job is None:
+                    return None
+            if self._on_start is not None:
+                self._on_start(job)
+            return job
+
+    def _thread_work(self) -> None:
+        try:
+            while (job := self._take_job()) is not None:
+                try:
+                    self._run_job(job)
+                except Exception as e:
+                    print(f"{self._name}: job failed: {e}")
+        finally:
+            # Also on unexpected errors: a dead worker left in the list would never be replaced.
+            with self.condition:
+                if threading.current_thread() in self.workers:
+                    self.workers.remove(threading.current_thread())
+
+    def ensure_workers(self, worker_count: int, pending_count: int) -> None:
+        """Starts workers up to `worker_count`, never more than `pending_count` jobs need, and wakes them."""
+        with self.condition:
+            wanted = min(worker_count, pending_count)
+            while len(self.workers) < wanted:
+                worker = threading.Thread(target=self._thread_work, daemon=True)
+                self.workers.append(worker)
+                worker.start()
+            self.condition.notify_all()
+
+    def has_workers(self) -> bool:
+        with self.condition:
+            return bool(self.workers)
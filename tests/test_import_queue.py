@@ -0,0 +1,38 @@
+"""Import queue scheduling. Needs Blender's Python (bpy), e.g.:
+
+    blender -b --factory-startup --python-expr "import sys, pytest; sys.exit(pytest.main(['tests']))"
+"""
+import pytest
+
+pytest.importorskip("bpy")
+
+from hunyuan3d_blender.ops import result_management  # noqa: E402
+
+
+@pytest.fixture
+def import_queue(tmp_path):
+    result_management.import_request_queue.clear()
+    result_management.import_jobs.clear()
+    yield tmp_path
+    result_management.import_request_queue.clear()
+    result_management.import_jobs.clear()
+
+
+def _queue_glb(directory, asset_id: str, size: int) -> None:
+    filepath = directory / f"{asset_id}.glb"
+    filepath.write_bytes(b"\0" * size)
+    with result_management._download_condition:
+        result_management._push_import_job(asset_id, str(filepath), result_management.PRIORITY_SAVE)
+
+
+def test_large_job_is_popped_first_in_tick(import_queue):
+    _queue_glb(import_queue, "large", 5 * 1024 * 1024)
+    job = result_management._pop_import_job(elapsed=0.001, first=True)
+    assert job is not None and job.asset_id == "large"
+    assert job.status == 'importing'
+
+
+def test_large_job_waits_for_next_tick_after_first(import_queue):
+    _queue_glb(import_queue, "large", 5 * 1024 * 1024)
+    assert result_management._pop_import_job(elapsed=0.001, first=False) is None
+    assert result_management._pop_import_job(elapsed=0.001, first=True) is not None